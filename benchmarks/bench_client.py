@@ -0,0 +1,106 @@
+"""Benchmarks the main client paths against the local stand-in server.
+
+Every scenario reports the API calls per second, the records per second, the p50 and p99 latency of the calls and
+the peak memory allocated by Python while it runs. The peak memory is measured in a second run, since tracing the
+allocations slows the first one down.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_client.py [--records 20000] [--latency 0.005] [--workers 8]
+
+"""
+import argparse
+import time
+import tracemalloc
+
+from sugarcrm.client import Client
+from sugarcrm.standin import StandInServer
+
+
+class TimedClient(Client):
+    """Client recording the duration of every API call."""
+
+    def __init__(self, *args, **kwargs):
+        self.durations = []
+        super().__init__(*args, **kwargs)
+
+    def _post(self, endpoint, params=None, **kwargs):
+        start = time.perf_counter()
+        try:
+            return super()._post(endpoint, params, **kwargs)
+        finally:
+            self.durations.append(time.perf_counter() - start)
+
+
+def scenarios(args):
+    def get_entry(client, ids):
+        for id in ids[:200]:
+            client.get_entry('Accounts', id)
+        return min(len(ids), 200)
+
+    def get_entry_list(client, ids):
+        for offset in range(0, 50 * 100, 100):
+            client.get_entry_list('Accounts', offset=offset, max_results=100)
+        return 50 * 100
+
+    def iter_entry_list(client, ids):
+        return sum(1 for _ in client.iter_entry_list('Accounts', page_size=500))
+
+    def iter_entry_list_prefetch(client, ids):
+        return sum(1 for _ in client.iter_entry_list('Accounts', page_size=500, prefetch=True))
+
+    def iter_entry_list_stream(client, ids):
+        return sum(1 for _ in client.iter_entry_list('Accounts', page_size=500, stream=True))
+
+    def iter_entry_list_parallel(client, ids):
+        return sum(1 for _ in client.iter_entry_list_parallel('Accounts', page_size=500, order_by='accounts.id',
+                                                              max_workers=args.workers))
+
+    def get_entries_bulk(client, ids):
+        return len(client.get_entries_bulk('Accounts', ids, chunk_size=200, max_workers=args.workers).entries)
+
+    def iter_set_entries(client, ids):
+        records = ({'id': id, 'description': 'Updated'} for id in ids[:5000])
+        return sum(1 for _ in client.iter_set_entries('Accounts', records, batch_size=100, max_workers=args.workers))
+
+    return [get_entry, get_entry_list, iter_entry_list, iter_entry_list_prefetch, iter_entry_list_stream,
+            iter_entry_list_parallel, get_entries_bulk, iter_set_entries]
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))] if values else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--records', type=int, default=20000)
+    parser.add_argument('--latency', type=float, default=0.005)
+    parser.add_argument('--workers', type=int, default=8)
+    args = parser.parse_args()
+
+    with StandInServer(records=args.records, latency=args.latency) as server:
+        client = TimedClient(server.url, 'admin', 'admin', pool_maxsize=args.workers)
+        ids = [entry['id'] for entry in client.iter_entry_list('Accounts', page_size=1000, select_fields=['id'])]
+        print('{} records per module, {:.1f} ms latency, {} workers'.format(args.records, args.latency * 1000,
+                                                                             args.workers))
+        print('{:26} {:>9} {:>11} {:>9} {:>9} {:>9}'.format('scenario', 'calls/s', 'records/s', 'p50 ms',
+                                                            'p99 ms', 'peak MB'))
+        for scenario in scenarios(args):
+            client.durations = []
+            start = time.perf_counter()
+            records = scenario(client, ids)
+            elapsed = time.perf_counter() - start
+            durations = list(client.durations)
+
+            tracemalloc.start()
+            scenario(client, ids)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            print('{:26} {:9.1f} {:11.0f} {:9.2f} {:9.2f} {:9.1f}'.format(
+                scenario.__name__, len(durations) / elapsed, records / elapsed, percentile(durations, 50) * 1000,
+                percentile(durations, 99) * 1000, peak / 2 ** 20))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""Measures the client side overhead per call, without a server: encoding the request, the transport layers of
+requests and parsing the response.
+
+Responses are served in memory by a requests adapter, so the timings only include the work done by the client.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_overhead.py [CALLS] [RECORDS]
+
+"""
+import json
+import sys
+import time
+
+import requests
+import requests.adapters
+
+from sugarcrm import codec
+from sugarcrm.client import Client
+
+
+class CannedAdapter(requests.adapters.BaseAdapter):
+    """Answers every request with the body of its API method."""
+
+    def __init__(self, bodies):
+        super().__init__()
+        self.bodies = bodies
+
+    def send(self, request, **kwargs):
+        response = requests.Response()
+        response.status_code = 200
+        response.headers['Content-Type'] = 'application/json; charset=UTF-8'
+        response._content = self.bodies[request.url.rsplit('?', 1)[1]]
+        response.request = request
+        response.url = request.url
+        return response
+
+    def close(self):
+        pass
+
+
+def entry_list_body(records, fields=20):
+    names = ['id'] + ['field_{}'.format(i) for i in range(fields - 1)]
+    entries = []
+    for i in range(records):
+        values = {name: {'name': name, 'value': '{}-{}'.format(name, i)} for name in names}
+        entries.append({'id': 'id-{}'.format(i), 'module_name': 'Accounts', 'name_value_list': values})
+    return json.dumps({'result_count': records, 'total_count': str(records), 'next_offset': records,
+                       'entry_list': entries, 'relationship_list': []}).encode('utf8')
+
+
+def client(records, json_codec):
+    client = Client('http://crm.invalid', 'admin', 'admin', lazy_login=True, json_codec=json_codec)
+    client.requests_session.mount('http://', CannedAdapter({
+        'login': b'{"id": "session"}',
+        'get_entry_list': entry_list_body(records),
+        'get_entries_count': b'{"result_count": 1000, "deleted_count": 0}',
+        'set_entries': json.dumps({'ids': ['id-{}'.format(i) for i in range(100)]}).encode('utf8'),
+    }))
+    return client
+
+
+def measure(func, calls, repeat=5):
+    """Returns the best mean time per call, in microseconds, of repeat runs."""
+    func()
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(calls):
+            func()
+        best = min(best, time.perf_counter() - start)
+    return best / calls * 1e6
+
+
+def main(calls=200, records=1000):
+    records_to_set = [{'name': 'Account {}'.format(i), 'industry': 'Energy', 'description': 'x' * 100}
+                      for i in range(100)]
+    codecs = [('json', codec.StdlibCodec())]
+    if codec.orjson is not None:
+        codecs.append(('orjson', codec.OrjsonCodec()))
+    print('{:8} {:>24} {:>20} {:>22}'.format('codec', 'get_entry_list (us)', 'get_entries_count (us)',
+                                             'set_entries x100 (us)'))
+    for name, json_codec in codecs:
+        c = client(records, json_codec)
+        page = measure(lambda: c.get_entry_list('Accounts', max_results=records, deleted=False), calls)
+        count = measure(lambda: c.get_entries_count('Accounts'), calls * 10)
+        write = measure(lambda: c.set_entries('Accounts', records_to_set), calls)
+        print('{:8} {:>24.0f} {:>20.0f} {:>22.0f}'.format(name, page, count, write))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
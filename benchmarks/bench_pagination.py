@@ -0,0 +1,41 @@
+"""Compares walking a whole module with offset pagination against keyset pagination.
+
+The time per page of offset pagination grows with the offset, because the server skips the previous rows, while
+keyset pagination seeks the index on (date_modified, id).
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_pagination.py [RECORDS] [PAGE_SIZE]
+
+"""
+import sys
+import time
+
+from sugarcrm.client import Client
+from sugarcrm.standin import StandInServer
+
+
+def walk(client, page_size, pagination):
+    """Returns the number of records, the total time and the time of the last page."""
+    kwargs = {'order_by': 'accounts.date_modified, accounts.id'} if pagination == 'offset' else {}
+    count, start, page_start, last_page = 0, time.perf_counter(), time.perf_counter(), 0.0
+    for _ in client.iter_entry_list('Accounts', page_size=page_size, pagination=pagination, select_fields=['name'],
+                                    **kwargs):
+        count += 1
+        if count % page_size == 0:
+            now = time.perf_counter()
+            last_page, page_start = now - page_start, now
+    return count, time.perf_counter() - start, last_page
+
+
+def main(records=100000, page_size=200):
+    with StandInServer(records=records) as server:
+        client = Client(server.url, 'admin', 'admin')
+        results = {pagination: walk(client, page_size, pagination) for pagination in ('offset', 'keyset')}
+    for pagination, (count, total, last_page) in results.items():
+        print('{:6} pagination: {} records in {:6.2f}s, last page {:6.1f}ms'.format(
+            pagination, count, total, last_page * 1000))
+    print('keyset speedup: {:.2f}x'.format(results['offset'][1] / results['keyset'][1]))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
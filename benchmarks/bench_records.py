@@ -0,0 +1,53 @@
+"""Compares the memory and decoding throughput of raw entry_list dicts against records and columns.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_records.py [RECORDS] [FIELDS]
+
+"""
+import gc
+import json
+import sys
+import time
+import tracemalloc
+
+from sugarcrm.records import decode_columns, decode_records
+
+
+def entry_list_json(records, fields):
+    names = ['id'] + ['field_{}'.format(i) for i in range(fields - 1)]
+    entries = []
+    for i in range(records):
+        values = {name: {'name': name, 'value': '{}-{}'.format(name, i)} for name in names}
+        values['id']['value'] = 'id-{}'.format(i)
+        entries.append({'id': 'id-{}'.format(i), 'module_name': 'Accounts', 'name_value_list': values})
+    return json.dumps(entries)
+
+
+def measure(text, decode):
+    gc.collect()
+    tracemalloc.start()
+    result = json.loads(text)
+    if decode:
+        result = decode(result)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+
+    entry_list = json.loads(text)
+    start = time.perf_counter()
+    if decode:
+        decode(entry_list)
+    return retained, peak, time.perf_counter() - start
+
+
+def main(records=50000, fields=20):
+    text = entry_list_json(records, fields)
+    print('{} records x {} fields'.format(records, fields))
+    print('{:8} {:>12} {:>12} {:>16}'.format('mode', 'retained MB', 'peak MB', 'decoded/s'))
+    for name, decode in (('raw', None), ('records', decode_records), ('columns', decode_columns)):
+        retained, peak, elapsed = measure(text, decode)
+        rate = '{:16.0f}'.format(records / elapsed) if decode else '{:>16}'.format('-')
+        print('{:8} {:12.1f} {:12.1f} {}'.format(name, retained / 2 ** 20, peak / 2 ** 20, rate))
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
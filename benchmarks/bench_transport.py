@@ -0,0 +1,32 @@
+"""Compares the calls per second of the pooled keep-alive session against one connection per call.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_transport.py [CALLS]
+
+"""
+import sys
+import time
+
+import requests
+
+from sugarcrm.client import Client
+from sugarcrm.standin import StandInServer
+
+
+def run(client, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        client.get_entries_count('Accounts')
+    return calls / (time.perf_counter() - start)
+
+
+def main(calls=2000):
+    with StandInServer(records=10) as server:
+        unpooled = run(Client(server.url, 'admin', 'admin', requests_session=requests), calls)
+        pooled = run(Client(server.url, 'admin', 'admin'), calls)
+    print('bare requests.post: {:8.1f} calls/s'.format(unpooled))
+    print('pooled session:     {:8.1f} calls/s ({:.2f}x)'.format(pooled, pooled / unpooled))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
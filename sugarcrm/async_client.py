@@ -0,0 +1,280 @@
+import asyncio
+import os
+import ssl
+from urllib.parse import quote_plus
+from sugarcrm import exception
+from sugarcrm.client import FORM_HEADERS, Client, _form_prefix
+from sugarcrm.codec import StdlibCodec
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    aiohttp = None
+
+
+def _unsupported(name):
+    def method(self, *args, **kwargs):
+        raise NotImplementedError('{} is not supported by AsyncClient, use Client'.format(name))
+
+    method.__name__ = name
+    return method
+
+
+class AsyncClient(Client):
+    """Client for asyncio applications.
+
+    The API methods have the same arguments as in Client but return an awaitable. The HTTP connections are pooled
+    by a single aiohttp session, so many calls can be in flight at the same time without a thread per call.
+
+    The features of Client built on threads or on streamed requests responses are not supported and raise
+    NotImplementedError: the bulk and fan-out methods, stream=True, keyset pagination and streamed note
+    attachments. Neither are metrics, limiter, metadata_cache and entry_cache.
+
+    Usage:
+        async with AsyncClient('SERVER_URL', 'USERNAME', 'PASSWORD') as client:
+            response = await client.get_entry_list('MODULE_NAME')
+
+    """
+
+    session_id = None
+    metadata_cache = None
+    metrics = None
+    entry_cache = None
+    limiter = None
+
+    def __init__(self, url, username, password, app='sugarcrm-python', lang='en_US', verify=True, aiohttp_session=None,
+                 limit=100, limit_per_host=0, timeout=None, session_store=None, json_codec=None):
+        if aiohttp is None:
+            raise ImportError('AsyncClient requires aiohttp. e.g. pip install sugarcrm-python[async]')
+        self.url = self._rest_url(url)
+        self.username = username
+        self.password = password
+        self.app = app
+        self.lang = lang
+        self.verify = verify
+        self.aiohttp_session = aiohttp_session
+        self._owns_session = aiohttp_session is None
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.timeout = timeout
+        self.session_store = session_store
+        self.json_codec = json_codec or StdlibCodec()
+        self.session_id = None
+        self._login_lock = None
+
+    async def __aenter__(self):
+        await self.login()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def login(self, force=False):
+        """Sets the session id, reusing the one cached in the session store unless force is True.
+
+        Args:
+            force: If a new session should be created even if there is one in the session store.
+
+        Returns:
+            The session id.
+
+        """
+        if self.session_store is not None and not force:
+            session_id = self.session_store.get(self.session_key)
+            if session_id is not None:
+                self.session_id = session_id
+                return session_id
+        try:
+            response = await self._login()
+        except aiohttp.InvalidURL:
+            raise exception.InvalidURL("Please check your url '{0}' has a valid schema: 'http://', 'https://'".format(self.url))
+        self.session_id = response['id']
+        if self.session_store is not None:
+            self.session_store.set(self.session_key, self.session_id)
+        return self.session_id
+
+    async def _relogin(self, expired_session_id):
+        if self._login_lock is None:
+            self._login_lock = asyncio.Lock()
+        async with self._login_lock:
+            if self.session_id == expired_session_id:
+                if self.session_store is not None:
+                    self.session_store.delete(self.session_key, expired_session_id)
+                await self.login(force=self.session_store is None)
+            return self.session_id
+
+    async def close(self):
+        """Closes the aiohttp session if it was created by the client."""
+        if self._owns_session and self.aiohttp_session is not None:
+            await self.aiohttp_session.close()
+            self.aiohttp_session = None
+
+    def _get_session(self):
+        if self.aiohttp_session is None:
+            connector = aiohttp.TCPConnector(limit=self.limit, limit_per_host=self.limit_per_host,
+                                             ssl=self._ssl())
+            timeout = aiohttp.ClientTimeout(total=self.timeout)
+            self.aiohttp_session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        return self.aiohttp_session
+
+    def _ssl(self):
+        """The ssl argument of the connector: the default checks, none, or a context trusting the CA bundle of verify."""
+        if isinstance(self.verify, (str, os.PathLike)):
+            if os.path.isdir(self.verify):
+                return ssl.create_default_context(capath=self.verify)
+            return ssl.create_default_context(cafile=self.verify)
+        return None if self.verify else False
+
+    async def _post(self, endpoint, params=None, **kwargs):
+        try:
+            return await self._send(endpoint, params, **kwargs)
+        except exception.InvalidSession:
+            if endpoint == 'login' or not params:
+                raise
+            params = [await self._relogin(params[0])] + params[1:]
+            return await self._send(endpoint, params, **kwargs)
+
+    async def _send(self, endpoint, params=None, **kwargs):
+        data = _form_prefix(endpoint) + quote_plus(self.json_codec.dumps(params)).encode('ascii')
+        async with self._get_session().post(self.url + endpoint, data=data, headers=FORM_HEADERS,
+                                            **kwargs) as response:
+            if response.status >= 500:
+                raise self._http_error(response.status, response.reason)
+            return self._parse(await response.read())
+
+    async def _then(self, response, func):
+        return func(await response)
+
+    def _parse(self, content):
+        try:
+            r = self.json_codec.loads(content)
+        except ValueError:
+            return content.decode('utf8', 'replace')
+        return self._check_error(r)
+
+    get_entries_bulk = _unsupported('get_entries_bulk')
+    iter_set_entries = _unsupported('iter_set_entries')
+    get_relationships_bulk = _unsupported('get_relationships_bulk')
+    iter_search_by_module = _unsupported('iter_search_by_module')
+
+    def get_entry_list(self, module_name, *, stream=False, **kwargs):
+        if stream:
+            raise NotImplementedError('stream is not supported by AsyncClient, use Client')
+        return super().get_entry_list(module_name, **kwargs)
+
+    def get_relationships(self, *args, stream=False, **kwargs):
+        if stream:
+            raise NotImplementedError('stream is not supported by AsyncClient, use Client')
+        return super().get_relationships(*args, **kwargs)
+
+    def get_note_attachment(self, noteid, dest=None):
+        if dest is not None:
+            raise NotImplementedError('dest is not supported by AsyncClient, use Client')
+        return super().get_note_attachment(noteid)
+
+    def set_note_attachment(self, noteid, filename, filecontent, related_module_id=None, related_module_name=None):
+        if not isinstance(filecontent, str):
+            raise TypeError('AsyncClient only accepts the filecontent as a base64 encoded str')
+        return super().set_note_attachment(noteid, filename, filecontent, related_module_id, related_module_name)
+
+    async def iter_entry_list(self, module_name, *, page_size=100, prefetch=False, offset=0, pagination='offset',
+                              **kwargs):
+        """Iterates over every bean matching the query specifications, requesting one page at a time.
+
+        Args:
+            module_name: The name of the module from which to retrieve records. Note: This is the modules key which may not be the same as the modules display name.
+            page_size: The number of records requested per call to get_entry_list.
+            prefetch: If the next page should be requested in the background while the current one is consumed.
+            offset: The record offset from which to start.
+            pagination: Only 'offset' is supported.
+            **kwargs: Any other keyword argument accepted by get_entry_list, e.g. query, order_by or select_fields.
+
+        Yields:
+            A dict per record of the entry_list.
+
+        """
+        if pagination != 'offset':
+            raise NotImplementedError('keyset pagination is not supported by AsyncClient, use Client')
+        if page_size <= 0:
+            raise exception.WrongParameter('page_size must be greater than 0')
+        if kwargs.get('decode') == 'columns':
+            raise exception.WrongParameter("decode='columns' is not supported when iterating records")
+        task = None
+        try:
+            page = await self.get_entry_list(module_name, offset=offset, max_results=page_size, **kwargs)
+            while True:
+                entries = page.get('entry_list') or []
+                next_offset = int(page.get('next_offset', offset + len(entries)))
+                total_count = page.get('total_count')
+                has_more = bool(entries) and next_offset > offset
+                if has_more and total_count is not None:
+                    has_more = next_offset < int(total_count)
+
+                if has_more and prefetch:
+                    task = asyncio.ensure_future(self.get_entry_list(module_name, offset=next_offset,
+                                                                     max_results=page_size, **kwargs))
+                page = None
+                for entry in entries:
+                    yield entry
+                if not has_more:
+                    return
+                offset = next_offset
+                if task:
+                    page, task = await task, None
+                else:
+                    page = await self.get_entry_list(module_name, offset=offset, max_results=page_size, **kwargs)
+        finally:
+            if task:
+                task.cancel()
+
+    async def iter_entry_list_parallel(self, module_name, *, page_size=100, max_in_flight=4, ordered=True, query="",
+                                       deleted=False, **kwargs):
+        """Iterates over every bean matching the query specifications, requesting several pages concurrently.
+
+        The offsets of the pages are planned from get_entries_count, so an order_by clause on a stable column
+        should be given for the pages not to overlap, and records created while iterating may be missed.
+
+        Args:
+            module_name: The name of the module from which to retrieve records. Note: This is the modules key which may not be the same as the modules display name.
+            page_size: The number of records requested per call to get_entry_list.
+            max_in_flight: The maximum number of pages requested or buffered at the same time.
+            ordered: If the records should be yielded in offset order, or page by page as soon as they arrive.
+            query: The SQL WHERE clause without the word "where".
+            deleted: If deleted records should be included in the results.
+            **kwargs: Any other keyword argument accepted by get_entry_list, e.g. order_by or select_fields.
+
+        Yields:
+            A dict per record of the entry_list.
+
+        """
+        if page_size <= 0:
+            raise exception.WrongParameter('page_size must be greater than 0')
+        if kwargs.get('decode') == 'columns':
+            raise exception.WrongParameter("decode='columns' is not supported when iterating records")
+        response = await self.get_entries_count(module_name, query=query, deleted=deleted)
+        offsets = iter(range(0, int(response['result_count']), page_size))
+        pending = []
+
+        def submit():
+            for offset in offsets:
+                pending.append(asyncio.ensure_future(self.get_entry_list(
+                    module_name, offset=offset, query=query, deleted=deleted, max_results=page_size, **kwargs)))
+                return
+
+        try:
+            for _ in range(max(max_in_flight, 1)):
+                submit()
+            while pending:
+                if ordered:
+                    task = pending.pop(0)
+                else:
+                    done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    task = done.pop()
+                    pending.remove(task)
+                page = await task
+                submit()
+                for entry in page.get('entry_list') or []:
+                    yield entry
+        finally:
+            for task in pending:
+                task.cancel()
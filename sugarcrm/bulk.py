@@ -0,0 +1,18 @@
+from collections import namedtuple
+
+WriteResult = namedtuple('WriteResult', ['record', 'id', 'error'])
+WriteResult.__doc__ = """The outcome of writing one record in a bulk call. Either id or error is None."""
+
+FetchResult = namedtuple('FetchResult', ['entries', 'relationships', 'missing'])
+FetchResult.__doc__ = """The records of a bulk fetch by id.
+
+entries maps every found id to its entry, relationships maps it to its relationship_list item if links were
+requested, and missing lists the ids the server did not return or reported as deleted or not accessible.
+"""
+
+SearchHit = namedtuple('SearchHit', ['module_name', 'rank', 'record'])
+SearchHit.__doc__ = """A record found by a fan-out search.
+
+rank is the position of the record in the results of its module, starting at 0, and record is its
+name_value_list.
+"""
@@ -0,0 +1,210 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache(object):
+    """Thread safe LRU cache whose entries expire after ttl seconds.
+
+    Expired entries are kept until they are evicted, so they can be revalidated and refreshed with touch
+    instead of being downloaded again. Entries can be tagged when they are set, to invalidate at once every entry
+    with a tag. A value read before an invalidation can be set with the generation read before it, so it is not
+    cached if one of its tags was invalidated in the meantime. If path is given the cache is loaded from and saved to
+    that JSON file, so keys and values must be JSON serializable. Tags are not persisted.
+
+    Args:
+        maxsize: The maximum number of entries. The least recently used entry is evicted when it is exceeded.
+        ttl: The number of seconds an entry is fresh.
+        path: The path of the file where the cache is persisted.
+
+    """
+
+    def __init__(self, maxsize=128, ttl=3600, path=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.path = path
+        self._entries = OrderedDict()
+        self._tags = {}
+        self._key_tags = {}
+        self._generation = 0
+        # The generation of the last invalidation of the most recently invalidated tags. A value set with a
+        # generation older than _floor is not cached, as its tags may have been invalidated and forgotten since.
+        self._invalidated = OrderedDict()
+        self._floor = 0
+        self._lock = threading.RLock()
+        if path is not None:
+            self.load()
+
+    @staticmethod
+    def _key(key):
+        return json.dumps(key, sort_keys=True)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def lookup(self, key):
+        """Returns a (value, fresh) tuple, or None if key is not cached."""
+        with self._lock:
+            k = self._key(key)
+            entry = self._entries.get(k)
+            if entry is None:
+                return None
+            self._entries.move_to_end(k)
+            value, expires_at = entry
+            return value, expires_at > time.time()
+
+    def get(self, key, default=None):
+        """Returns the value of key, or default if it is not cached or has expired."""
+        entry = self.lookup(key)
+        if entry is None or not entry[1]:
+            return default
+        return entry[0]
+
+    @property
+    def generation(self):
+        """The number of invalidations, to be passed to set with a value read after it."""
+        return self._generation
+
+    def set(self, key, value, tags=(), generation=None):
+        """Caches value, unless generation is given and one of tags was invalidated after it.
+
+        Args:
+            key: The key, which must be JSON serializable.
+            value: The value.
+            tags: The tags, to invalidate the entry with.
+            generation: The generation read before value, if it may have been invalidated while it was read.
+
+        """
+        with self._lock:
+            if generation is not None and self._is_stale(tags, generation):
+                return
+            k = self._key(key)
+            self._entries[k] = (value, time.time() + self.ttl)
+            self._entries.move_to_end(k)
+            self._untag(k)
+            if tags:
+                tags = [self._key(tag) for tag in tags]
+                self._key_tags[k] = tags
+                for tag in tags:
+                    self._tags.setdefault(tag, set()).add(k)
+            while len(self._entries) > self.maxsize:
+                self._untag(self._entries.popitem(last=False)[0])
+            self._save()
+
+    def invalidate(self, tag):
+        """Deletes every entry set with tag."""
+        with self._lock:
+            tag = self._key(tag)
+            self._generation += 1
+            self._invalidated[tag] = self._generation
+            self._invalidated.move_to_end(tag)
+            while len(self._invalidated) > self.maxsize:
+                self._floor = self._invalidated.popitem(last=False)[1]
+            keys = self._tags.pop(tag, ())
+            for k in keys:
+                self._entries.pop(k, None)
+                self._untag(k)
+            if keys:
+                self._save()
+
+    def _is_stale(self, tags, generation):
+        if generation < self._floor:
+            return True
+        return any(self._invalidated.get(self._key(tag), 0) > generation for tag in tags)
+
+    def _untag(self, k):
+        for tag in self._key_tags.pop(k, ()):
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(k)
+                if not keys:
+                    del self._tags[tag]
+
+    def touch(self, key):
+        """Makes an expired entry fresh again without replacing its value."""
+        with self._lock:
+            k = self._key(key)
+            if k in self._entries:
+                self._entries[k] = (self._entries[k][0], time.time() + self.ttl)
+                self._save()
+
+    def delete(self, key):
+        with self._lock:
+            k = self._key(key)
+            self._untag(k)
+            if self._entries.pop(k, None) is not None:
+                self._save()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+            self._key_tags.clear()
+            self._generation += 1
+            self._floor = self._generation
+            self._invalidated.clear()
+            self._save()
+
+    def load(self):
+        """Loads the entries saved in path, ignoring a missing or corrupted file."""
+        try:
+            with open(self.path) as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return
+        with self._lock:
+            self._entries = OrderedDict((k, tuple(entry)) for k, entry in entries)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def _save(self):
+        if self.path is None:
+            return
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)))
+        with os.fdopen(fd, 'w') as f:
+            json.dump(list(self._entries.items()), f)
+        os.replace(tmp, self.path)
+
+
+class SingleFlight(object):
+    """Coalesces concurrent calls with the same key: only the first one runs, the others wait for its result."""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func):
+        """Runs func, unless a call with the same key is in flight, and returns its result or raises its error."""
+        k = json.dumps(key, sort_keys=True)
+        with self._lock:
+            call = self._calls.get(k)
+            leader = call is None
+            if leader:
+                call = self._calls[k] = _Call()
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[k]
+            call.event.set()
+        return call.result
+
+
+class _Call(object):
+    __slots__ = ('event', 'result', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
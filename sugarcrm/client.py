@@ -1,38 +1,216 @@
-import json
+import copy
+import io
 import hashlib
+import os
+import queue
+import random
+import threading
+import time
 import requests
+import requests.adapters
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
+from urllib.parse import quote_plus, urlencode
 from sugarcrm import exception
+from sugarcrm import query as query_builder
+from sugarcrm.bulk import FetchResult, SearchHit, WriteResult
+from sugarcrm.cache import SingleFlight
+from sugarcrm.codec import StdlibCodec
+from sugarcrm.concurrency import chunked, imap
 from sugarcrm.decorator import valid_parameters
 from sugarcrm.enumerator import ErrorEnum
+from sugarcrm.records import decode_entry_list
+from sugarcrm.streaming import Base64File, JSONStream, decode_base64_member, iter_form
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+FORM_HEADERS = {'Content-Type': 'application/x-www-form-urlencoded'}
+
+
+@lru_cache(maxsize=None)
+def _form_fields(endpoint):
+    return {'method': endpoint, 'input_type': 'JSON', 'response_type': 'JSON'}
+
+
+@lru_cache(maxsize=None)
+def _form_prefix(endpoint):
+    """The urlencoded form fields of endpoint, up to the value of rest_data, which is appended on every call."""
+    return '{}&rest_data='.format(urlencode(_form_fields(endpoint))).encode('ascii')
+
+
+def page_info(page, offset):
+    """Returns the entries of a get_entry_list page, if there are more pages and the offset of the next one."""
+    if isinstance(page, JSONStream):
+        info, entries = page.meta, page
+    else:
+        info, entries = page, page.get('entry_list') or []
+    count = int(info['result_count']) if 'result_count' in info else len(entries)
+    next_offset = int(info.get('next_offset', offset + count))
+    has_more = count > 0 and next_offset > offset
+    if has_more and info.get('total_count') is not None:
+        has_more = next_offset < int(info['total_count'])
+    return entries, has_more, next_offset
 
 
 class Client(object):
-    def __init__(self, url, username, password, app='sugarcrm-python', lang='en_US', verify=True, requests_session=None, requests_hooks=None):
-        if not url.endswith('/service/v4_1/rest.php'):
-            if not url.endswith('/'):
-                url += '/'
-            url += 'service/v4_1/rest.php'
-        self.url = url + '?'
+    # The CA bundle of the environment, used when verify is True once it is resolved for a session the client owns.
+    _ca_bundle = True
+
+    def __init__(self, url, username, password, app='sugarcrm-python', lang='en_US', verify=True, requests_session=None, requests_hooks=None,
+                 timeout=None, pool_connections=10, pool_maxsize=10, keep_alive=True, max_retries=3, backoff_factor=0.5,
+                 lazy_login=False, session_store=None, metadata_cache=None, metrics=None, entry_cache=None,
+                 limiter=None, json_codec=None):
+        self.url = self._rest_url(url)
         self.username = username
         self.password = password
         self.app = app
         self.lang = lang
         self.verify = verify
+        self._owns_session = requests_session is None
+        if requests_session is None:
+            requests_session = self._build_session(pool_connections, pool_maxsize, keep_alive)
         self.requests_session = requests_session
+        if self._owns_session:
+            self._resolve_environment()
         if requests_hooks and not isinstance(requests_hooks, dict):
             raise Exception('requests_hooks must be a dict. e.g. {"response": func}. http://docs.python-requests.org/en/master/user/advanced/#event-hooks')
         self.requests_hooks = requests_hooks
-        try:
-            response = self._login()
-        except requests.exceptions.InvalidSchema:
-            raise exception.InvalidURL("Please check your url '{0}' has a valid schema: 'http://', 'https://'".format(response.url))
-        self.session_id = response['id']
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.session_store = session_store
+        self.metadata_cache = metadata_cache
+        self.metrics = metrics
+        if getattr(entry_cache, 'path', None) is not None:
+            raise exception.WrongParameter('entry_cache cannot be persisted, as the tags that invalidate its entries are not')
+        self.entry_cache = entry_cache
+        self.limiter = limiter
+        self.json_codec = json_codec or StdlibCodec()
+        self._single_flight = SingleFlight()
+        self._session_id = None
+        self._login_lock = threading.RLock()
+        if not lazy_login:
+            self.login()
+
+    @property
+    def session_id(self):
+        """The id of the session, logging in on first use if the client was created with lazy_login."""
+        if self._session_id is None:
+            self.login()
+        return self._session_id
+
+    @session_id.setter
+    def session_id(self, session_id):
+        self._session_id = session_id
+
+    @property
+    def session_key(self):
+        """The key of the session in the session store.
+
+        It is a digest of the URL, the user name and the password, so a session is only reused by clients with the
+        same credentials, and the store does not hold them.
+        """
+        credentials = '{}|{}|{}'.format(self.url, self.username, self._password_digest())
+        return hashlib.sha256(credentials.encode('utf8')).hexdigest()
+
+    def _password_digest(self):
+        return hashlib.md5(self.password.encode('utf8')).hexdigest()
+
+    def login(self, force=False):
+        """Sets the session id, reusing the current one or the one cached in the session store unless force is True.
+
+        Args:
+            force: If a new session should be created even if the client or the session store has one.
+
+        Returns:
+            The session id.
+
+        """
+        with self._login_lock:
+            # Checked under the lock, so threads making their first call together log in once.
+            if self._session_id is not None and not force:
+                return self._session_id
+            session_id = None
+            if self.session_store is not None and not force:
+                session_id = self.session_store.get(self.session_key)
+            if session_id is None:
+                try:
+                    response = self._login()
+                except requests.exceptions.InvalidSchema:
+                    raise exception.InvalidURL("Please check your url '{0}' has a valid schema: 'http://', 'https://'".format(self.url))
+                session_id = response['id']
+                if self.session_store is not None:
+                    self.session_store.set(self.session_key, session_id)
+            self._session_id = session_id
+            return session_id
+
+    def _relogin(self, expired_session_id):
+        with self._login_lock:
+            # Another thread may have already renewed the session.
+            if self._session_id == expired_session_id:
+                if self.session_store is not None:
+                    self.session_store.delete(self.session_key, expired_session_id)
+                self._session_id = None
+                self.login(force=self.session_store is None)
+            return self._session_id
+
+    @staticmethod
+    def _build_session(pool_connections, pool_maxsize, keep_alive):
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        if not keep_alive:
+            session.headers['Connection'] = 'close'
+        return session
+
+    def _resolve_environment(self):
+        """Resolves the proxies, CA bundle and .netrc credentials of the environment once.
+
+        Otherwise requests looks them up on every call, scanning os.environ, which costs more than the rest of the
+        client side work of a small call.
+        """
+        session = self.requests_session
+        settings = session.merge_environment_settings(self.url, {}, None, True, None)
+        session.proxies.update(settings['proxies'])
+        if session.auth is None:
+            session.auth = requests.utils.get_netrc_auth(self.url)
+        self._ca_bundle = settings['verify']
+        self.verify = self.verify
+        session.trust_env = False
+
+    @property
+    def verify(self):
+        """If the certificate of the server is verified, or the path of the CA bundle to verify it with.
+
+        It can be changed at any time. True uses the CA bundle of the environment, e.g. REQUESTS_CA_BUNDLE, as
+        resolved when the client was created.
+        """
+        return self._verify_option
+
+    @verify.setter
+    def verify(self, verify):
+        self._verify_option = verify
+        self._verify = self._ca_bundle if verify is True or verify is None else verify
+
+    def close(self):
+        """Closes the pooled connections if the requests session was created by the client."""
+        if self._owns_session:
+            self.requests_session.close()
+
+    @staticmethod
+    def _rest_url(url):
+        if not url.endswith('/service/v4_1/rest.php'):
+            if not url.endswith('/'):
+                url += '/'
+            url += 'service/v4_1/rest.php'
+        return url + '?'
 
     def _login(self):
         params = [
             {
                 'user_name': self.username,
-                'password': hashlib.md5(self.password.encode('utf8')).hexdigest()
+                'password': self._password_digest()
             },
             self.app,
             [{
@@ -42,30 +220,126 @@ class Client(object):
         ]
         return self._post('login', params=params)
 
-    def _post(self, endpoint, params=None, **kwargs):
-        data = {
-            'method': endpoint,
-            'input_type': 'JSON',
-            'response_type': 'JSON',
-            'rest_data': json.dumps(params)
-        }
-        if self.requests_session:
-            client = self.requests_session
+    def _post(self, endpoint, params=None, replay=True, **kwargs):
+        try:
+            return self._send(endpoint, params, **kwargs)
+        except exception.InvalidSession as e:
+            if endpoint == 'login' or not params:
+                raise
+            session_id = self._relogin(params[0])
+            if not replay:
+                raise exception.InvalidSession('{}. The session was renewed, but the request cannot be sent again'
+                                               .format(e), number=e.number) from e
+            params = [session_id] + params[1:]
+            return self._send(endpoint, params, **kwargs)
+
+    def _send(self, endpoint, params=None, **kwargs):
+        if self.metrics is None:
+            return self._request(endpoint, params, None, **kwargs)
+        call = self.metrics.start(endpoint)
+        try:
+            result = self._request(endpoint, params, call, **kwargs)
+        except Exception as e:
+            self.metrics.finish(call, e)
+            raise
+        self.metrics.finish(call)
+        return result
+
+    def _request(self, endpoint, params, call, parse=None, upload=False, **kwargs):
+        if call is not None:
+            start = time.perf_counter()
+        if upload:
+            # The params contain a Base64File, which is encoded while the request body is sent.
+            rest_data = None
+            data = iter_form(_form_fields(endpoint), 'rest_data', params)
         else:
-            client = requests
+            rest_data = self.json_codec.dumps(params)
+            data = _form_prefix(endpoint) + quote_plus(rest_data).encode('ascii')
+        if call is not None:
+            call.encode_time = time.perf_counter() - start
+            call.request_bytes = len(data) if rest_data is not None else 0
+        kwargs['headers'] = FORM_HEADERS
         if self.requests_hooks:
             kwargs.update({'hooks': self.requests_hooks})
-        return self._parse(client.post(self.url + endpoint, data=data, verify=self.verify, **kwargs))
-
-    def _parse(self, response):
-        if 'application/json' in response.headers['Content-Type']:
-            r = response.json()
-        else:
+        if self.timeout is not None:
+            kwargs.setdefault('timeout', self.timeout)
+        retries = self.max_retries if self._is_idempotent(endpoint) else 0
+        attempt = 0
+        while True:
             try:
-                r = response.json()  # Una version anterior de SugarCRM no utiliza los headers adecuadamente.
-            except Exception:
-                return response.text
+                response = self._post_http(endpoint, data, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt >= retries:
+                    raise
+            else:
+                if response.status_code < 500:
+                    break
+                # Closed so a streamed response does not hold its connection.
+                response.close()
+                if attempt >= retries:
+                    raise self._http_error(response.status_code, response.reason)
+            time.sleep(random.uniform(0, self.backoff_factor * 2 ** attempt))
+            attempt += 1
+            if call is not None:
+                call.retries = attempt
+
+        if parse is None:
+            parse = self._parse_stream if kwargs.get('stream') else self._parse
+        if call is None:
+            return parse(response)
+        start = time.perf_counter()
+        try:
+            return parse(response)
+        finally:
+            call.decode_time = time.perf_counter() - start
+            call.response_bytes = int(response.headers.get('Content-Length') or 0) if kwargs.get('stream') \
+                else len(response.content)
+
+    def _post_http(self, endpoint, data, **kwargs):
+        if self.limiter is None:
+            return self.requests_session.post(self.url + endpoint, data=data, verify=self._verify, **kwargs)
+        start = self.limiter.acquire()
+        try:
+            response = self.requests_session.post(self.url + endpoint, data=data, verify=self._verify, **kwargs)
+        except Exception as e:
+            # Only a server that does not answer in time counts as overloaded, not e.g. an invalid URL.
+            self.limiter.release(start, error=isinstance(e, (requests.exceptions.ConnectionError,
+                                                             requests.exceptions.Timeout)))
+            raise
+        self.limiter.release(start, error=response.status_code >= 500 or response.status_code == 429)
+        return response
+
+    @staticmethod
+    def _http_error(status, reason):
+        return exception.UnknownError('Error: HTTP {}. Message {}'.format(status, reason), number=status)
+
+    @staticmethod
+    def _is_idempotent(endpoint):
+        return endpoint.startswith('get_') or endpoint in ('login', 'search_by_module')
 
+    def _parse(self, response):
+        try:
+            r = self.json_codec.loads(response.content)  # Una version anterior de SugarCRM no utiliza los headers adecuadamente.
+        except ValueError:
+            if 'application/json' in response.headers.get('Content-Type', ''):
+                raise
+            return response.text
+        return self._check_error(r)
+
+    def _parse_stream(self, response):
+        stream = JSONStream(response.iter_content(chunk_size=STREAM_CHUNK_SIZE), on_close=response.close)
+        try:
+            if not stream.open():
+                self._check_error(stream.meta)
+        except ValueError as e:
+            stream.close()
+            raise exception.UnknownError('Error: {}'.format(e))
+        except Exception:
+            stream.close()
+            raise
+        return stream
+
+    def _check_error(self, r):
         if 'name' in r and 'description' in r and 'number' in r:
             code = r['number']
             message = r['description']
@@ -73,9 +347,11 @@ class Client(object):
             try:
                 error_enum = ErrorEnum(code)
             except Exception:
-                raise exception.UnknownError('Error: {}. Message {}'.format(code, message))
+                raise exception.UnknownError('Error: {}. Message {}'.format(code, message), number=code)
             if error_enum == ErrorEnum.InvalidLogin:
-                raise exception.InvalidLogin(message)
+                raise exception.InvalidLogin(message, number=code)
+            if error_enum == ErrorEnum.InvalidSession:
+                raise exception.InvalidSession(message, number=code)
         return r
 
     def get_available_modules(self, filter='default'):
@@ -89,10 +365,12 @@ class Client(object):
 
         """
         data = [self.session_id, filter]
-        return self._post('get_available_modules', data)
+        return self._cached(('get_available_modules', self.session_key, filter),
+                            lambda: self._post('get_available_modules', data))
 
     @valid_parameters
-    def get_entries(self, module_name, ids, *, select_fields=[], link_name_to_fields_array={}, track_view=False):
+    def get_entries(self, module_name, ids, *, select_fields=[], link_name_to_fields_array={}, track_view=False,
+                    decode=None):
         """Retrieves a list of beans based on specified record IDs.
 
         Args:
@@ -101,6 +379,8 @@ class Client(object):
             select_fields: The list of fields to be returned in the results. Specifying an empty array will return all fields.
             link_name_to_fields_array: A list of link names and the fields to be returned for each link.
             track_view: Flag the record as a recently viewed item.
+            decode: If given, the entry_list is decoded to compact records ('records') or to a list of values per
+                field ('columns').
 
         Returns:
             A dict.
@@ -109,9 +389,68 @@ class Client(object):
         if isinstance(ids, str):
             ids = [ids]
         if link_name_to_fields_array:
-            link_name_to_fields_array = [{'name': k.lower(), 'value': v} for k, v in link_name_to_fields_array.items()]
-        data = [self.session_id, module_name, ids, select_fields, link_name_to_fields_array, track_view]
-        return self._post('get_entries', data)
+            link_name_to_fields_array = self._name_value_list(link_name_to_fields_array)
+        if self.entry_cache is not None and not track_view:
+            response = self._get_entries_cached('get_entries', module_name, ids, select_fields,
+                                                link_name_to_fields_array)
+        else:
+            data = [self.session_id, module_name, ids, select_fields, link_name_to_fields_array, track_view]
+            response = self._post('get_entries', data)
+        if decode:
+            return self._then(response, partial(self._decode, decode, select_fields))
+        return response
+
+    def get_entries_bulk(self, module_name, ids, *, chunk_size=100, max_workers=4, max_in_flight=None, **kwargs):
+        """Retrieves many beans by record ID, removing duplicated IDs and requesting them in concurrent chunks.
+
+        Args:
+            module_name: The name of the module from which to retrieve records. Note: This is the modules key which may not be the same as the modules display name.
+            ids: An iterable of record IDs to retrieve.
+            chunk_size: The number of IDs requested per call to get_entries.
+            max_workers: The number of threads used to request chunks.
+            max_in_flight: The maximum number of chunks requested or buffered at the same time. Defaults to max_workers.
+            **kwargs: Any other keyword argument accepted by get_entries, e.g. select_fields, except decode: the
+                entries are needed as returned to tell the missing ones apart.
+
+        Returns:
+            A FetchResult.
+
+        """
+        if chunk_size <= 0:
+            raise exception.WrongParameter('chunk_size must be greater than 0')
+        if kwargs.get('decode'):
+            raise exception.WrongParameter('get_entries_bulk does not support decode. '
+                                           'Decode the entries with sugarcrm.records.decode_dict instead')
+        ids = list(dict.fromkeys(ids))
+        fetch = partial(self._get_entries_chunk, module_name, **kwargs)
+        entries, relationships = {}, {}
+        for chunk in imap(fetch, chunked(ids, chunk_size), max_workers=max_workers, max_in_flight=max_in_flight,
+                          ordered=False):
+            for entry, relationship in chunk:
+                if self._is_missing(entry):
+                    continue
+                entries[entry['id']] = entry
+                if relationship is not None:
+                    relationships[entry['id']] = relationship
+        missing = [id for id in ids if id not in entries]
+        return FetchResult(entries, relationships, missing)
+
+    def _get_entries_chunk(self, module_name, ids, **kwargs):
+        response = self.get_entries(module_name, ids, **kwargs)
+        entry_list = response.get('entry_list') or []
+        relationship_list = response.get('relationship_list') or []
+        relationship_list = relationship_list + [None] * (len(entry_list) - len(relationship_list))
+        return list(zip(entry_list, relationship_list))
+
+    @staticmethod
+    def _is_missing(entry):
+        # SugarCRM returns a warning instead of the attributes for deleted or inaccessible records.
+        name_value_list = entry.get('name_value_list')
+        if not name_value_list or not entry.get('id'):
+            return True
+        if isinstance(name_value_list, list):
+            return any(item.get('name') == 'warning' for item in name_value_list)
+        return 'warning' in name_value_list
 
     @valid_parameters
     def get_entries_count(self, module_name, *, query="", deleted=False):
@@ -145,13 +484,60 @@ class Client(object):
 
         """
         if link_name_to_fields_array:
-            link_name_to_fields_array = [{'name': k.lower(), 'value': v} for k, v in link_name_to_fields_array.items()]
+            link_name_to_fields_array = self._name_value_list(link_name_to_fields_array)
+        if self.entry_cache is not None and not track_view:
+            return self._get_entries_cached('get_entry', module_name, [id], select_fields, link_name_to_fields_array)
         data = [self.session_id, module_name, id, select_fields, link_name_to_fields_array, track_view]
         return self._post('get_entry', data)
 
+    def _get_entries_cached(self, endpoint, module_name, ids, select_fields, link_name_to_fields_array):
+        """Returns a get_entry or get_entries response built from the entry cache, requesting only the missing ids.
+
+        Concurrent requests for the same missing ids are coalesced in a single call. The entries are copies, so
+        callers can modify them, and entries invalidated while they are requested are not cached.
+        """
+        def key(id):
+            return self.session_key, module_name, id, select_fields, link_name_to_fields_array
+
+        cached = {id: self.entry_cache.get(key(id)) for id in ids}
+        missing = [id for id, value in cached.items() if value is None]
+        if missing:
+            def fetch():
+                generation = self.entry_cache.generation
+                data = [self.session_id, module_name, missing[0] if endpoint == 'get_entry' else missing,
+                        select_fields, link_name_to_fields_array, False]
+                response = self._post(endpoint, data)
+                relationship_list = response.get('relationship_list') or []
+                fetched = {}
+                for i, entry in enumerate(response.get('entry_list') or []):
+                    value = (entry, relationship_list[i] if i < len(relationship_list) else None)
+                    if not self._is_missing(entry):
+                        self.entry_cache.set(key(entry['id']), value, tags=[self._entry_tag(module_name, entry['id'])],
+                                             generation=generation)
+                    fetched[entry['id']] = value
+                return fetched
+
+            cached.update(self._single_flight.do(('entries', key(tuple(missing))), fetch))
+        values = [copy.deepcopy(cached[id]) if cached.get(id) else
+                  ({'id': id, 'module_name': module_name, 'name_value_list': []}, None) for id in ids]
+        return {
+            'entry_list': [entry for entry, _ in values],
+            'relationship_list': [relationship for _, relationship in values] if link_name_to_fields_array else [],
+        }
+
+    def _entry_tag(self, module_name, id):
+        return self.url, module_name, id
+
+    def _invalidate_entries(self, module_name, ids):
+        if self.entry_cache is not None:
+            for id in ids:
+                if id:
+                    self.entry_cache.invalidate(self._entry_tag(module_name, id))
+
     @valid_parameters
     def get_entry_list(self, module_name, *, query="", order_by="", offset=0, select_fields=[],
-                       link_name_to_fields_array={}, max_results=0, deleted=False, favorites=False):
+                       link_name_to_fields_array={}, max_results=0, deleted=False, favorites=False, decode=None,
+                       stream=False):
         """Retrieves a list of beans based on query specifications.
 
         Args:
@@ -164,16 +550,177 @@ class Client(object):
             max_results: The maximum number of results to return.
             deleted: If deleted records should be included in the results.
             favorites: 	If only records marked as favorites should be returned.
+            decode: If given, the entry_list is decoded to compact records ('records') or to a list of values per
+                field ('columns').
+            stream: If the entry_list should be decoded incrementally while the response is received.
 
         Returns:
-            A dict.
+            A dict, or a JSONStream yielding the entries if stream is True.
 
         """
+        if decode and stream:
+            raise exception.WrongParameter('decode and stream cannot be used together')
         if link_name_to_fields_array:
-            link_name_to_fields_array = [{'name': k.lower(), 'value': v} for k, v in link_name_to_fields_array.items()]
+            link_name_to_fields_array = self._name_value_list(link_name_to_fields_array)
         data = [self.session_id, module_name, query, order_by, offset, select_fields, link_name_to_fields_array,
                 max_results, int(deleted), favorites]
-        return self._post('get_entry_list', data)
+        if stream:
+            return self._post('get_entry_list', data, stream=True)
+        response = self._post('get_entry_list', data)
+        if decode:
+            return self._then(response, partial(self._decode, decode, select_fields))
+        return response
+
+    @staticmethod
+    def _decode(mode, fields, response):
+        if isinstance(response, dict):
+            response['entry_list'] = decode_entry_list(response.get('entry_list') or [], mode, fields)
+        return response
+
+    def _then(self, response, func):
+        """Applies func to the response of _post. AsyncClient overrides it to apply func once it is awaited."""
+        return func(response)
+
+    def iter_entry_list(self, module_name, *, page_size=100, prefetch=False, offset=0, pagination='offset',
+                        keys=('date_modified', 'id'), table=None, **kwargs):
+        """Iterates over every bean matching the query specifications, requesting one page at a time.
+
+        With pagination='offset' the pages are requested by offset, which the server skips row by row, so deep
+        pages of large modules get slower. With pagination='keyset' they are ordered by keys, and every page is
+        requested with a query clause selecting the rows after the last one seen, which an index on keys seeks
+        directly.
+
+        Args:
+            module_name: The name of the module from which to retrieve records. Note: This is the modules key which may not be the same as the modules display name.
+            page_size: The number of records requested per call to get_entry_list.
+            prefetch: If the next page should be requested in the background while the current one is consumed.
+                Ignored with keyset pagination of a stream.
+            offset: The record offset from which to start. Only with offset pagination.
+            pagination: 'offset' or 'keyset'.
+            keys: The fields the records are ordered by with keyset pagination. They must not be empty and
+                together must be unique. They are added to select_fields if it is given.
+            table: The table of the module, used to qualify keys. Defaults to the module name in lower case.
+            **kwargs: Any other keyword argument accepted by get_entry_list, e.g. query, order_by, select_fields or
+                stream. order_by is not accepted with keyset pagination.
+
+        Yields:
+            A dict per record of the entry_list.
+
+        """
+        if page_size <= 0:
+            raise exception.WrongParameter('page_size must be greater than 0')
+        if kwargs.get('decode') == 'columns':
+            raise exception.WrongParameter("decode='columns' is not supported when iterating records")
+        if pagination == 'keyset':
+            if offset or kwargs.get('order_by'):
+                raise exception.WrongParameter('offset and order_by cannot be used with keyset pagination')
+            kwargs.pop('order_by', None)
+            return self._iter_entry_list_keyset(module_name, page_size, prefetch, list(keys),
+                                                table or module_name.lower(), **kwargs)
+        if pagination != 'offset':
+            raise exception.WrongParameter("pagination must be 'offset' or 'keyset'")
+        return self._iter_entry_list_offset(module_name, page_size, prefetch, offset, **kwargs)
+
+    def _iter_entry_list_offset(self, module_name, page_size, prefetch, offset, **kwargs):
+        executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+        try:
+            page = self.get_entry_list(module_name, offset=offset, max_results=page_size, **kwargs)
+            while True:
+                entries, has_more, next_offset = page_info(page, offset)
+                future = None
+                if has_more and executor:
+                    future = executor.submit(self.get_entry_list, module_name, offset=next_offset,
+                                             max_results=page_size, **kwargs)
+                page = None
+                for entry in entries:
+                    yield entry
+                if not has_more:
+                    return
+                offset = next_offset
+                if future:
+                    page = future.result()
+                else:
+                    page = self.get_entry_list(module_name, offset=offset, max_results=page_size, **kwargs)
+        finally:
+            if executor:
+                executor.shutdown(wait=False)
+
+    def _iter_entry_list_keyset(self, module_name, page_size, prefetch, keys, table, query="", select_fields=[],
+                                **kwargs):
+        if select_fields:
+            select_fields = list(select_fields) + [key for key in keys if key not in select_fields]
+        fetch = partial(self.get_entry_list, module_name, order_by=query_builder.order_by(keys, table),
+                        select_fields=select_fields, max_results=page_size, **kwargs)
+        stream = kwargs.get('stream')
+        executor = ThreadPoolExecutor(max_workers=1) if prefetch and not stream else None
+        try:
+            page = fetch(query=query)
+            while True:
+                info, entries = (page.meta, page) if stream else (page, page.get('entry_list') or [])
+                # total_count counts the rows after the previous page, so a page that has all of them is the last.
+                total_count = info.get('total_count')
+                future = None
+                if executor and entries and (total_count is None or len(entries) < int(total_count)):
+                    after = query_builder.keyset_clause(keys, self._key_values(entries[-1], keys), table)
+                    future = executor.submit(fetch, query=query_builder.and_(query, after))
+                page = None
+                count, last = 0, None
+                for last in entries:
+                    count += 1
+                    yield last
+                if not count or (total_count is not None and count >= int(total_count)):
+                    return
+                if future:
+                    page = future.result()
+                else:
+                    after = query_builder.keyset_clause(keys, self._key_values(last, keys), table)
+                    page = fetch(query=query_builder.and_(query, after))
+        finally:
+            if executor:
+                executor.shutdown(wait=False)
+
+    @staticmethod
+    def _key_values(entry, keys):
+        """Returns the values of keys in an entry, or in a record decoded from it."""
+        if not isinstance(entry, dict):
+            return [getattr(entry, key) for key in keys]
+        name_value_list = entry.get('name_value_list') or {}
+        return [entry['id'] if key == 'id' else name_value_list[key]['value'] for key in keys]
+
+    def iter_entry_list_parallel(self, module_name, *, page_size=100, max_workers=4, max_in_flight=None, ordered=True,
+                                 query="", deleted=False, **kwargs):
+        """Iterates over every bean matching the query specifications, requesting several pages concurrently.
+
+        The offsets of the pages are planned from get_entries_count, so an order_by clause on a stable column
+        should be given for the pages not to overlap, and records created while iterating may be missed.
+
+        Args:
+            module_name: The name of the module from which to retrieve records. Note: This is the modules key which may not be the same as the modules display name.
+            page_size: The number of records requested per call to get_entry_list.
+            max_workers: The number of threads used to request pages.
+            max_in_flight: The maximum number of pages requested or buffered at the same time. Defaults to max_workers.
+            ordered: If the records should be yielded in offset order, or page by page as soon as they arrive.
+            query: The SQL WHERE clause without the word "where".
+            deleted: If deleted records should be included in the results.
+            **kwargs: Any other keyword argument accepted by get_entry_list, e.g. order_by or select_fields.
+
+        Yields:
+            A dict per record of the entry_list.
+
+        """
+        if page_size <= 0:
+            raise exception.WrongParameter('page_size must be greater than 0')
+        if kwargs.get('decode') == 'columns':
+            raise exception.WrongParameter("decode='columns' is not supported when iterating records")
+        count = int(self.get_entries_count(module_name, query=query, deleted=deleted)['result_count'])
+        fetch = partial(self._get_entry_list_page, module_name, query=query, deleted=deleted, max_results=page_size,
+                        **kwargs)
+        for entries in imap(fetch, range(0, count, page_size), max_workers=max_workers, max_in_flight=max_in_flight,
+                            ordered=ordered):
+            yield from entries
+
+    def _get_entry_list_page(self, module_name, offset, **kwargs):
+        return self.get_entry_list(module_name, offset=offset, **kwargs).get('entry_list') or []
 
     @valid_parameters
     def get_module_fields(self, module_name, *, fields=[]):
@@ -188,22 +735,89 @@ class Client(object):
 
         """
         data = [self.session_id, module_name, fields]
-        return self._post('get_module_fields', data)
+        return self._cached(('get_module_fields', self.session_key, module_name, fields),
+                            lambda: self._post('get_module_fields', data),
+                            lambda: self.get_module_fields_md5(module_name))
+
+    def _cached(self, key, fetch, fetch_md5=None):
+        """Returns the response of fetch through the metadata cache.
+
+        An expired entry is kept if the md5 returned by fetch_md5 has not changed since it was cached. The response
+        is a copy, so callers can modify it.
+        """
+        if self.metadata_cache is None:
+            return fetch()
+        md5 = None
+        entry = self.metadata_cache.lookup(key)
+        if entry is not None:
+            value, fresh = entry
+            if fresh:
+                return copy.deepcopy(value['response'])
+            if fetch_md5 is not None:
+                md5 = fetch_md5()
+                if md5 == value['md5']:
+                    self.metadata_cache.touch(key)
+                    return copy.deepcopy(value['response'])
+        if fetch_md5 is not None and md5 is None:
+            md5 = fetch_md5()
+        response = fetch()
+        self.metadata_cache.set(key, {'response': response, 'md5': md5})
+        return copy.deepcopy(response)
 
     def set_entries(self, module_name, name_value_lists):
         """Create or update a list of records.
 
         Args:
             module_name: The name of the module from which to retrieve records. Note: This is the modules key which may not be the same as the modules display name.
-            name_value_lists: The an array of name/value lists containing the record attributes.
+            name_value_lists: A list of dicts with the attributes of every record. A single dict creates or updates one record.
 
         Returns:
             A dict.
 
         """
-        _dict = [{'name': k.lower(), 'value': v} for k, v in name_value_lists.items()]
+        if isinstance(name_value_lists, dict):
+            _dict = [self._name_value_list(name_value_lists)]
+            ids = [self._record_id(name_value_lists)]
+        else:
+            _dict = [self._name_value_list(record) for record in name_value_lists]
+            ids = [self._record_id(record) for record in name_value_lists]
         data = [self.session_id, module_name, _dict]
-        return self._post('set_entries', data)
+        if self.entry_cache is None:
+            return self._post('set_entries', data)
+        self._invalidate_entries(module_name, ids)
+        response = self._post('set_entries', data)
+        self._invalidate_entries(module_name, response.get('ids') or [])
+        return response
+
+    def iter_set_entries(self, module_name, records, *, batch_size=100, max_workers=4, max_in_flight=None):
+        """Creates or updates many records, sending them in batches of set_entries calls that run concurrently.
+
+        Args:
+            module_name: The name of the module from which to retrieve records. Note: This is the modules key which may not be the same as the modules display name.
+            records: An iterable of dicts with the attributes of every record. It is consumed lazily.
+            batch_size: The number of records sent per call to set_entries.
+            max_workers: The number of threads used to send batches.
+            max_in_flight: The maximum number of batches sent or buffered at the same time. Defaults to max_workers.
+
+        Yields:
+            A WriteResult per record, in the order of records. The error of every record of a failed batch is the
+            exception raised by its call.
+
+        """
+        if batch_size <= 0:
+            raise exception.WrongParameter('batch_size must be greater than 0')
+        send = partial(self._set_entries_batch, module_name)
+        for results in imap(send, chunked(records, batch_size), max_workers=max_workers, max_in_flight=max_in_flight):
+            yield from results
+
+    def _set_entries_batch(self, module_name, records):
+        try:
+            ids = self.set_entries(module_name, records)['ids']
+            if len(ids) != len(records):
+                raise exception.UnknownError('Expected {} ids, got {}'.format(len(records), len(ids)))
+        except Exception as e:
+            return [WriteResult(record, None, e) for record in records]
+        return [WriteResult(record, id, None) for record, id in zip(records, ids)]
 
     def set_entry(self, module_name, name_value_list):
         """Creates or updates a specific record.
@@ -216,9 +830,22 @@ class Client(object):
             A dict.
 
         """
-        _dict = [{'name': k.lower(), 'value': v} for k, v in name_value_list.items()]
+        _dict = self._name_value_list(name_value_list)
         data = [self.session_id, module_name, _dict]
-        return self._post('set_entry', data)
+        if self.entry_cache is None:
+            return self._post('set_entry', data)
+        self._invalidate_entries(module_name, [self._record_id(name_value_list)])
+        response = self._post('set_entry', data)
+        self._invalidate_entries(module_name, [response.get('id')])
+        return response
+
+    @staticmethod
+    def _name_value_list(record):
+        return [{'name': k.lower(), 'value': v} for k, v in record.items()]
+
+    @staticmethod
+    def _record_id(record):
+        return next((v for k, v in record.items() if k.lower() == 'id'), None)
 
     def get_document_revision(self):
         raise NotImplementedError
@@ -229,20 +856,116 @@ class Client(object):
     def get_last_viewed(self):
         raise NotImplementedError
 
-    def get_modified_relationships(self):
-        raise NotImplementedError
+    @valid_parameters
+    def get_modified_relationships(self, module_name, related_module, from_date, to_date, *, offset=0, max_results=0,
+                                   deleted=False, module_user_id='', select_fields=[], relationship_name='',
+                                   deletion_date=''):
+        """Retrieves the records of related_module whose relationship with module_name was modified in a date range.
 
-    def get_module_fields_md5(self):
-        raise NotImplementedError
+        Args:
+            module_name: The name of the module of the primary records, e.g. 'Users'.
+            related_module: The name of the related module, e.g. 'Meetings', 'Calls' or 'Contacts'.
+            from_date: The start of the range, formatted as 'Y-m-d H:i:s'.
+            to_date: The end of the range, formatted as 'Y-m-d H:i:s'.
+            offset: The record offset from which to start.
+            max_results: The maximum number of results to return.
+            deleted: If deleted relationships should be included in the results.
+            module_user_id: The id of the user of the primary records. Defaults to the current user.
+            select_fields: The list of fields of the related records to be returned.
+            relationship_name: The name of the relationship. Defaults to the one between both modules.
+            deletion_date: Only include the relationships deleted after this date, formatted as 'Y-m-d H:i:s'.
 
-    def get_module_layout(self):
-        raise NotImplementedError
+        Returns:
+            A dict.
 
-    def get_module_layout_md5(self):
-        raise NotImplementedError
+        """
+        data = [self.session_id, module_name, related_module, from_date, to_date, offset, max_results, int(deleted),
+                module_user_id, select_fields, relationship_name, deletion_date]
+        return self._post('get_modified_relationships', data)
 
-    def get_note_attachment(self):
-        raise NotImplementedError
+    def get_module_fields_md5(self, module_names):
+        """Retrieves the md5 hash of the vardefs of the specified modules.
+
+        Args:
+            module_names: A module name or a list of module names.
+
+        Returns:
+            A dict.
+
+        """
+        if isinstance(module_names, str):
+            module_names = [module_names]
+        data = [self.session_id, module_names]
+        return self._post('get_module_fields_md5', data)
+
+    def get_module_layout(self, module_names, types=['default'], views=['list', 'detail', 'edit'], acl_check=True):
+        """Retrieves the layout metadata of the specified modules.
+
+        Args:
+            module_names: A module name or a list of module names.
+            types: The list of layout types, e.g. 'default' or 'wireless'.
+            views: The list of views, e.g. 'list', 'detail', 'edit' or 'subpanel'.
+            acl_check: If the ACL of the user should be applied to the layouts.
+
+        Returns:
+            A dict.
+
+        """
+        if isinstance(module_names, str):
+            module_names = [module_names]
+        data = [self.session_id, module_names, types, views, acl_check]
+        return self._cached(('get_module_layout', self.session_key, module_names, types, views, acl_check),
+                            lambda: self._post('get_module_layout', data),
+                            lambda: self.get_module_layout_md5(module_names, types, views, acl_check))
+
+    def get_module_layout_md5(self, module_names, types=['default'], views=['list', 'detail', 'edit'], acl_check=True):
+        """Retrieves the md5 hash of the layout metadata of the specified modules.
+
+        Args:
+            module_names: A module name or a list of module names.
+            types: The list of layout types, e.g. 'default' or 'wireless'.
+            views: The list of views, e.g. 'list', 'detail', 'edit' or 'subpanel'.
+            acl_check: If the ACL of the user should be applied to the layouts.
+
+        Returns:
+            A dict.
+
+        """
+        if isinstance(module_names, str):
+            module_names = [module_names]
+        data = [self.session_id, module_names, types, views, acl_check]
+        return self._post('get_module_layout_md5', data)
+
+    def get_note_attachment(self, noteid, dest=None):
+        """Retrieves the attachment of a Note.
+
+        Args:
+            noteid: The ID of the Note containing the attachment.
+            dest: A path or a binary file object. If given, the attachment is decoded and written to it while the
+                response is received, and the file member of the response is left empty.
+
+        Returns:
+            A dict.
+
+        """
+        data = [self.session_id, noteid]
+        if dest is None:
+            return self._post('get_note_attachment', data)
+        return self._post('get_note_attachment', data, stream=True, parse=partial(self._parse_attachment, dest))
+
+    def _parse_attachment(self, dest, response):
+        chunks = response.iter_content(chunk_size=STREAM_CHUNK_SIZE)
+        try:
+            if hasattr(dest, 'write'):
+                r = decode_base64_member(chunks, 'file', dest)
+            else:
+                with open(dest, 'wb') as f:
+                    r = decode_base64_member(chunks, 'file', f)
+        except ValueError as e:
+            raise exception.UnknownError('Error: {}'.format(e))
+        finally:
+            response.close()
+        return self._check_error(r)
 
     def get_quotes_pdf(self):
         raise NotImplementedError
@@ -259,6 +982,7 @@ class Client(object):
         order_by="",
         offset=0,
         limit=False,
+        stream=False,
     ):
         """Retrieve a collection of beans that are related to the specified
         bean and optionally return relationship data for those related beans.
@@ -286,9 +1010,11 @@ class Client(object):
             order_by: field to order the result sets by
             offset: where to start in the return
             limit: number of results to return (defaults to all)
+            stream: if the entry_list should be decoded incrementally while
+                the response is received.
 
         Returns:
-            A dict.
+            A dict, or a JSONStream yielding the entries if stream is True.
         """
 
         data = [
@@ -304,8 +1030,138 @@ class Client(object):
             offset,
             limit,
         ]
+        if stream:
+            return self._post("get_relationships", data, stream=True)
         return self._post("get_relationships", data)
 
+    def get_relationships_bulk(
+        self,
+        module_name,
+        module_ids,
+        link_field_name,
+        related_module_query="",
+        related_fields=[],
+        related_module_link_name_to_fields_array=[],
+        deleted=False,
+        order_by="",
+        page_size=100,
+        max_workers=4,
+        max_in_flight=None,
+        use_entry_list=False,
+        table=None,
+        related_table=None,
+    ):
+        """Retrieve the beans related to many beans of the same module
+        through one link field, requesting them concurrently and paginating
+        every link until its last bean.
+
+        Args:
+            module_name: The name of the module that the primary records are
+                from.
+            module_ids: An iterable of IDs of beans in the specified module.
+            link_field_name: The name of the link field to return records
+                from.
+            related_module_query: A portion of the where clause of the SQL
+                statement to find the related items.
+            related_fields: Array of related bean fields to be returned.
+            related_module_link_name_to_fields_array: For every related bean
+                returned, specify link fields name to fields info for that
+                bean to be returned.
+            deleted: false if deleted records should not be include, true if
+                deleted records should be included.
+            order_by: field to order the result sets by. Defaults to the id of
+                the related beans, so the pages are stable.
+            page_size: number of related beans requested per call.
+            max_workers: number of threads used to send the calls.
+            max_in_flight: maximum number of calls sent or buffered at the same
+                time. Defaults to max_workers.
+            use_entry_list: request the related beans of page_size primary
+                beans at once with get_entry_list and its
+                link_name_to_fields_array, instead of a get_relationships call
+                per primary bean. related_module_query, order_by and
+                related_module_link_name_to_fields_array are not supported
+                this way, and the module_name of the related beans is None,
+                as get_entry_list does not return it.
+            table: the database table of the module, used in the
+                get_entry_list query. Defaults to the module name in lower
+                case.
+            related_table: the database table of the related module, which
+                qualifies the id column of the default order_by.
+
+        Returns:
+            A dict mapping every primary bean ID to the list of its related
+            beans.
+        """
+        if page_size <= 0:
+            raise exception.WrongParameter("page_size must be greater than 0")
+        module_ids = list(dict.fromkeys(module_ids))
+        if use_entry_list:
+            if related_module_query or order_by or related_module_link_name_to_fields_array:
+                raise exception.WrongParameter(
+                    "related_module_query, order_by and related_module_link_name_to_fields_array "
+                    "are not supported with use_entry_list"
+                )
+            fetch = partial(
+                self._get_linked_entries,
+                module_name,
+                link_field_name,
+                related_fields,
+                deleted,
+                table or module_name.lower(),
+            )
+            items = chunked(module_ids, page_size)
+        else:
+            order_by = order_by or query_builder.column("id", related_table)
+            fetch = partial(
+                self._get_all_relationships,
+                module_name,
+                link_field_name,
+                related_module_query,
+                related_fields,
+                related_module_link_name_to_fields_array,
+                deleted,
+                order_by,
+                page_size,
+            )
+            items = module_ids
+        related = dict.fromkeys(module_ids)
+        for result in imap(fetch, items, max_workers=max_workers, max_in_flight=max_in_flight, ordered=False):
+            related.update(result)
+        return related
+
+    def _get_all_relationships(self, module_name, link_field_name, related_module_query, related_fields,
+                               related_module_link_name_to_fields_array, deleted, order_by, page_size, module_id):
+        entries, offset = [], 0
+        while True:
+            response = self.get_relationships(module_name, module_id, link_field_name, related_module_query,
+                                              related_fields, related_module_link_name_to_fields_array,
+                                              deleted=deleted, order_by=order_by, offset=offset, limit=page_size)
+            page = response.get("entry_list") or []
+            entries.extend(page)
+            if len(page) < page_size:
+                return {module_id: entries}
+            offset += len(page)
+
+    def _get_linked_entries(self, module_name, link_field_name, related_fields, deleted, table, module_ids):
+        query = query_builder.in_(query_builder.column("id", table), module_ids)
+        response = self.get_entry_list(module_name, query=query, select_fields=["id"], max_results=len(module_ids),
+                                       link_name_to_fields_array={link_field_name: related_fields},
+                                       deleted=deleted)
+        related = {id: [] for id in module_ids}
+        relationship_list = response.get("relationship_list") or []
+        for entry, relationships in zip(response.get("entry_list") or [], relationship_list):
+            for link in relationships.get("link_list") or []:
+                if link.get("name") != link_field_name.lower():
+                    continue
+                for record in link.get("records") or []:
+                    values = record.get("link_value") or {}
+                    related[entry["id"]].append({
+                        "id": values.get("id", {}).get("value"),
+                        "module_name": None,
+                        "name_value_list": values,
+                    })
+        return related
+
     def get_report_entries(self):
         raise NotImplementedError
 
@@ -388,6 +1244,79 @@ class Client(object):
         ]
         return self._post("search_by_module", data)
 
+    def iter_search_by_module(self, search_string, modules, *, offset=0, max_results=20, page_size=None,
+                              max_workers=None, deadline=None, **kwargs):
+        """Searches every module concurrently, yielding the records of each module as soon as they are returned.
+
+        Every module is searched with its own calls to search_by_module, paged by offset and max_results, so a
+        slow module does not delay the results of the others.
+
+        Args:
+            search_string: string to search
+            modules: array of modules to query
+            offset: the offset of the first record of every module
+            max_results: the maximum number of records per module
+            page_size: the number of records requested per call. Defaults to max_results.
+            max_workers: the number of modules searched at the same time. Defaults to the number of modules.
+            deadline: the number of seconds after which the iteration stops, without the records that were not
+                returned yet.
+            **kwargs: Any other keyword argument accepted by search_by_module, e.g. select_fields.
+
+        Yields:
+            A SearchHit per record, in the order the pages of the modules are returned.
+
+        """
+        page_size = page_size or max_results
+        if page_size <= 0 or max_results <= 0:
+            raise exception.WrongParameter('max_results and page_size must be greater than 0')
+        modules = list(dict.fromkeys(modules))
+        if not modules:
+            return
+        end = time.monotonic() + deadline if deadline is not None else None
+        results = queue.Queue()
+        stop = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=max_workers or len(modules))
+        for module_name in modules:
+            executor.submit(self._search_module, search_string, module_name, offset, max_results, page_size, kwargs,
+                            results, stop)
+        try:
+            pending = len(modules)
+            while pending:
+                timeout = None if end is None else end - time.monotonic()
+                if timeout is not None and timeout <= 0:
+                    return
+                try:
+                    hits = results.get(timeout=timeout)
+                except queue.Empty:
+                    return
+                if hits is None:
+                    pending -= 1
+                elif isinstance(hits, BaseException):
+                    raise hits
+                else:
+                    yield from hits
+        finally:
+            stop.set()
+            executor.shutdown(wait=False)
+
+    def _search_module(self, search_string, module_name, offset, max_results, page_size, kwargs, results, stop):
+        """Pages through the results of one module, putting a list of SearchHit per page and None at the end."""
+        rank = 0
+        try:
+            while rank < max_results and not stop.is_set():
+                size = min(page_size, max_results - rank)
+                response = self.search_by_module(search_string, [module_name], offset=offset + rank,
+                                                 max_results=size, **kwargs)
+                records = next((item.get('records') or [] for item in response.get('entry_list') or []
+                                if item.get('name') == module_name), [])
+                results.put([SearchHit(module_name, rank + i, record) for i, record in enumerate(records)])
+                rank += len(records)
+                if len(records) < size:
+                    break
+        except Exception as e:
+            results.put(e)
+        results.put(None)
+
     def set_campaign_merge(self):
         raise NotImplementedError
 
@@ -409,13 +1338,20 @@ class Client(object):
         Args:
             noteid: The ID of the Note containing the attachment
             filename: The file name of the attachment
-            filecontent: The binary contents of the file.
+            filecontent: The contents of the file: a base64 encoded str, bytes, a binary file object or an
+                os.PathLike path. Bytes, files and paths are base64 encoded in chunks while the request is sent.
+                If the session expired, a file object that is not seekable is not sent again and InvalidSession
+                is raised.
             related_module_id: module id to which this note to related to
             related_module_name: module name to which this note to related to
 
         Returns:
             A dict.
         """
+        if isinstance(filecontent, (bytes, bytearray)):
+            filecontent = Base64File(io.BytesIO(filecontent))
+        elif isinstance(filecontent, os.PathLike) or hasattr(filecontent, 'read'):
+            filecontent = Base64File(filecontent)
         data = [
             self.session_id,
             {
@@ -426,7 +1362,8 @@ class Client(object):
                 "related_module_name": related_module_name,
             },
         ]
-
+        if isinstance(filecontent, Base64File):
+            return self._post("set_note_attachment", data, replay=filecontent.rewindable, upload=True)
         return self._post("set_note_attachment", data)
 
 
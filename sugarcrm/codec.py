@@ -0,0 +1,57 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class JSONCodec(object):
+    """Base class of the JSON backends used to encode the requests and decode the responses."""
+
+    def dumps(self, obj):
+        """Returns obj encoded as a JSON str or UTF-8 bytes."""
+        raise NotImplementedError
+
+    def loads(self, data):
+        """Decodes a JSON str or UTF-8 bytes."""
+        raise NotImplementedError
+
+
+class StdlibCodec(JSONCodec):
+    """Encodes and decodes with the json module of the standard library."""
+
+    def dumps(self, obj):
+        return json.dumps(obj)
+
+    def loads(self, data):
+        return json.loads(data)
+
+
+if orjson is not None:
+    _ORJSON_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+                       | orjson.OPT_PASSTHROUGH_SUBCLASS)
+
+
+class OrjsonCodec(JSONCodec):
+    """Encodes and decodes with orjson, which is several times faster than the json module. Pass it as json_codec.
+
+    Values orjson does not support, e.g. namedtuples or integers larger than 64 bits, are encoded with the json
+    module instead. So are datetimes, dataclasses and subclasses of str, int, dict and list, so they are encoded, or
+    raise a TypeError, as with the json module. Otherwise the requests differ in two ways: non-ASCII characters are
+    sent as UTF-8 instead of escapes, which the server decodes the same, and NaN and infinite floats are silently
+    sent as null, instead of as NaN or Infinity, which the server rejects.
+    """
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError('OrjsonCodec requires orjson. e.g. pip install sugarcrm-python[orjson]')
+
+    def dumps(self, obj):
+        try:
+            return orjson.dumps(obj, option=_ORJSON_OPTIONS)
+        except TypeError:
+            return json.dumps(obj)
+
+    def loads(self, data):
+        return orjson.loads(data)
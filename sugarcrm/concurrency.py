@@ -0,0 +1,54 @@
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
+
+
+def chunked(iterable, size):
+    """Splits iterable lazily into lists of at most size items."""
+    items = iter(iterable)
+    while True:
+        chunk = list(islice(items, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def imap(func, iterable, max_workers=4, max_in_flight=None, ordered=True):
+    """Applies func to every item of iterable on a thread pool, yielding the results lazily.
+
+    Args:
+        func: The callable to apply to every item.
+        iterable: The items to process. It is consumed lazily, as slots become available.
+        max_workers: The number of threads of the pool.
+        max_in_flight: The maximum number of submitted calls that have not been yielded yet. Defaults to max_workers.
+        ordered: If the results should be yielded in the order of iterable, or as soon as they are ready.
+
+    Yields:
+        The result of every call to func.
+
+    """
+    max_in_flight = max(max_in_flight or max_workers, 1)
+    items = iter(iterable)
+    pending = deque()
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        for item in items:
+            pending.append(executor.submit(func, item))
+            if len(pending) >= max_in_flight:
+                break
+        while pending:
+            if ordered:
+                future = pending.popleft()
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                future = done.pop()
+                pending.remove(future)
+            result = future.result()
+            for item in items:
+                pending.append(executor.submit(func, item))
+                break
+            yield result
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False)
@@ -1,5 +1,6 @@
 from sugarcrm.exception import WrongParameter
 from functools import wraps
+from inspect import signature
 
 params = {
     'offset': int,
@@ -14,11 +15,20 @@ params = {
 
 
 def valid_parameters(func):
+    # Only the parameters of func are checked, so the lookup is done once instead of on every call.
+    parameters = signature(func).parameters
+    if any(p.kind == p.VAR_KEYWORD for p in parameters.values()):
+        checks = params
+    else:
+        checks = {k: params[k] for k in parameters if k in params}
+
     @wraps(func)
     def helper(*args, **kwargs):
-        for k, v in kwargs.items():
-            if k in params.keys() and not isinstance(v, params[k]):
-                raise WrongParameter('{} must be {} not {}'.format(k, params[k].__name__, type(v).__name__))
+        if kwargs:
+            for k, v in kwargs.items():
+                expected = checks.get(k)
+                if expected is not None and not isinstance(v, expected):
+                    raise WrongParameter('{} must be {} not {}'.format(k, expected.__name__, type(v).__name__))
 
         return func(*args, **kwargs)
 
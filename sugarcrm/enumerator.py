@@ -3,3 +3,4 @@ from enum import Enum
 
 class ErrorEnum(Enum):
     InvalidLogin = 10
+    InvalidSession = 11
@@ -1,5 +1,7 @@
 class BaseError(Exception):
-    pass
+    def __init__(self, *args, number=None):
+        super().__init__(*args)
+        self.number = number
 
 
 class UnknownError(BaseError):
@@ -10,6 +12,10 @@ class InvalidLogin(BaseError):
     pass
 
 
+class InvalidSession(BaseError):
+    pass
+
+
 class WrongParameter(BaseError):
     pass
 
@@ -0,0 +1,221 @@
+import argparse
+import csv
+import io
+import json
+import multiprocessing
+import os
+import queue
+import tempfile
+import threading
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from sugarcrm.client import Client, page_info
+from sugarcrm.exception import WrongParameter
+from sugarcrm.records import decode_dict, decode_records
+
+FORMATS = ('jsonl', 'csv')
+
+ExportResult = namedtuple('ExportResult', ['records', 'pages', 'resumed'])
+ExportResult.__doc__ = """The number of records and pages written by an export, and if it resumed from a checkpoint."""
+
+_DONE = object()
+
+
+def export_module(client, module_name, path, *, format='jsonl', select_fields=[], query='', order_by='',
+                  deleted=False, page_size=500, processes=0, max_pending=4, checkpoint=None):
+    """Streams the records of a module query to a JSONL or CSV file.
+
+    Fetching the pages, decoding and serializing them, and writing them to the file run as overlapping stages:
+    a thread requests the pages, a worker thread, or a pool of processes, serializes them, and the calling thread
+    writes them in order. At most max_pending pages are held in memory at once.
+
+    If checkpoint is given, the offset of the next page and the size of the file are saved there after every page
+    is written, and an interrupted export resumes from them. The checkpoint is deleted once the export completes.
+    Resuming relies on the pages being requested in the same order, so order_by should be a stable clause, e.g.
+    'accounts.date_entered, accounts.id'.
+
+    Args:
+        client: The Client used to request the records.
+        module_name: The name of the module from which to export records.
+        path: The path of the file to write.
+        format: 'jsonl' for one JSON object per line or 'csv'.
+        select_fields: The fields to export. Defaults to every field of the first record.
+        query: The SQL WHERE clause without the word "where".
+        order_by: The SQL ORDER BY clause without the phrase "order by".
+        deleted: If the deleted records should be exported instead of the live ones, as SugarCRM returns only
+            deleted records when deleted is set.
+        page_size: The number of records requested per call to get_entry_list.
+        processes: The number of processes used to serialize the pages. 0 serializes them in a thread.
+        max_pending: The maximum number of pages fetched but not written yet.
+        checkpoint: The path of the checkpoint file, or None to always export from the start.
+
+    Returns:
+        An ExportResult.
+
+    """
+    if format not in FORMATS:
+        raise WrongParameter('format must be one of {}'.format(', '.join(FORMATS)))
+    if page_size <= 0:
+        raise WrongParameter('page_size must be greater than 0')
+    options = {'module_name': module_name, 'format': format, 'select_fields': list(select_fields), 'query': query,
+               'order_by': order_by, 'deleted': deleted}
+    state = _load_checkpoint(checkpoint, options)
+    resumed = state is not None and os.path.exists(path)
+    if not resumed:
+        state = dict(options, offset=0, size=0, records=0, pages=0, columns=None)
+
+    pages = queue.Queue(maxsize=max(max_pending, 1))
+    stop = threading.Event()
+    if processes > 0:
+        # The workers start once the fetcher thread is running, and forking a threaded process can deadlock.
+        executor = ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context('spawn'))
+    else:
+        executor = ThreadPoolExecutor(max_workers=1)
+    fetcher = threading.Thread(target=_fetch, args=(client, module_name, options, state, page_size, executor, pages,
+                                                    stop), daemon=True)
+    fetcher.start()
+    try:
+        with open(path, 'r+b' if resumed else 'wb') as f:
+            # Drop whatever was written after the last checkpoint.
+            f.truncate(state['size'])
+            f.seek(state['size'])
+            while True:
+                item = pages.get()
+                if item is _DONE:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                future, next_offset, count, columns = item
+                f.write(future.result())
+                f.flush()
+                state.update(offset=next_offset, size=f.tell(), records=state['records'] + count,
+                             pages=state['pages'] + 1, columns=columns)
+                if checkpoint is not None:
+                    _save_checkpoint(checkpoint, state)
+    finally:
+        stop.set()
+        executor.shutdown(wait=False)
+    if checkpoint is not None and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    return ExportResult(state['records'], state['pages'], resumed)
+
+
+def _fetch(client, module_name, options, state, page_size, executor, pages, stop):
+    """Requests the pages from the checkpointed offset and queues their serialization, in order."""
+    offset = state['offset']
+    columns = state['columns']
+    first = state['pages'] == 0
+    try:
+        while not stop.is_set():
+            page = client.get_entry_list(module_name, query=options['query'], order_by=options['order_by'],
+                                         offset=offset, select_fields=options['select_fields'],
+                                         max_results=page_size, deleted=options['deleted'])
+            entries, has_more, next_offset = page_info(page, offset)
+            entries = list(entries)
+            if entries:
+                if options['format'] == 'csv' and columns is None:
+                    fields = options['select_fields'] or list(decode_dict(entries[0]))
+                    columns = ['id'] + [field for field in fields if field != 'id']
+                future = executor.submit(serialize_page, options['format'], entries, columns, first)
+                first = False
+                if not _put(pages, (future, next_offset, len(entries), columns), stop):
+                    return
+            if not has_more or not entries:
+                break
+            offset = next_offset
+        _put(pages, _DONE, stop)
+    except BaseException as e:
+        _put(pages, e, stop)
+
+
+def _put(pages, item, stop):
+    while not stop.is_set():
+        try:
+            pages.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def serialize_page(format, entry_list, columns=None, header=False):
+    """Serializes the entries of an entry_list to JSONL or CSV bytes.
+
+    Args:
+        format: 'jsonl' or 'csv'.
+        entry_list: The entry_list of a get_entry_list response.
+        columns: The fields of the CSV rows, starting with id.
+        header: If the CSV header row should be included.
+
+    Returns:
+        The UTF-8 encoded lines.
+
+    """
+    if format == 'jsonl':
+        return ''.join(json.dumps(decode_dict(entry)) + '\n' for entry in entry_list).encode('utf8')
+    out = io.StringIO()
+    writer = csv.writer(out)
+    records = decode_records(entry_list, columns)
+    if header:
+        writer.writerow(columns)
+    writer.writerows(records)
+    return out.getvalue().encode('utf8')
+
+
+def _load_checkpoint(path, options):
+    if path is None:
+        return None
+    try:
+        with open(path) as f:
+            state = json.load(f)
+    except FileNotFoundError:
+        return None
+    if any(state.get(key) != value for key, value in options.items()):
+        raise WrongParameter('The checkpoint {} belongs to another export'.format(path))
+    return state
+
+
+def _save_checkpoint(path, state):
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)))
+    with os.fdopen(fd, 'w') as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Exports the records of a SugarCRM module to a JSONL or CSV file.')
+    parser.add_argument('module', help='the name of the module, e.g. Accounts')
+    parser.add_argument('output', help='the path of the file to write')
+    parser.add_argument('--url', default=os.environ.get('SUGARCRM_URL'), help='defaults to $SUGARCRM_URL')
+    parser.add_argument('--username', default=os.environ.get('SUGARCRM_USERNAME'),
+                        help='defaults to $SUGARCRM_USERNAME')
+    parser.add_argument('--password', default=os.environ.get('SUGARCRM_PASSWORD'),
+                        help='defaults to $SUGARCRM_PASSWORD')
+    parser.add_argument('--format', choices=FORMATS, help='defaults to the extension of the output')
+    parser.add_argument('--fields', default='', help='comma separated fields, defaults to every field')
+    parser.add_argument('--query', default='')
+    parser.add_argument('--order-by', default='')
+    parser.add_argument('--deleted', action='store_true', help='export the deleted records instead of the live ones')
+    parser.add_argument('--page-size', type=int, default=500)
+    parser.add_argument('--processes', type=int, default=0, help='processes used to serialize the pages')
+    parser.add_argument('--no-resume', action='store_true', help='do not checkpoint and resume the export')
+    args = parser.parse_args()
+    if not (args.url and args.username and args.password):
+        parser.error('--url, --username and --password are required')
+    format = args.format or ('csv' if args.output.lower().endswith('.csv') else 'jsonl')
+    client = Client(args.url, args.username, args.password)
+    try:
+        result = export_module(client, args.module, args.output, format=format,
+                               select_fields=[field for field in args.fields.split(',') if field],
+                               query=args.query, order_by=args.order_by, deleted=args.deleted,
+                               page_size=args.page_size, processes=args.processes,
+                               checkpoint=None if args.no_resume else args.output + '.checkpoint')
+    finally:
+        client.close()
+    print('Exported {} records in {} pages to {}{}'.format(result.records, result.pages, args.output,
+                                                          ' (resumed)' if result.resumed else ''))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+import threading
+import time
+
+
+class TokenBucket(object):
+    """Limits the rate of calls to rate per second, allowing bursts of up to burst calls.
+
+    Args:
+        rate: The number of tokens added per second.
+        burst: The maximum number of tokens. Defaults to rate, and at least 1.
+
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = max(float(burst if burst is not None else rate), 1.0)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Takes a token, waiting until one is available."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # The token is taken now, even if the balance goes negative, so waiting callers keep their order.
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+        if wait:
+            time.sleep(wait)
+
+
+class AIMDLimiter(object):
+    """Limits the calls in flight, adapting the limit to the latency and errors of the server.
+
+    The limit grows by increase every limit successful calls (additive increase) and is multiplied by decrease
+    (multiplicative decrease) when a call fails or its latency exceeds latency_tolerance times the baseline latency,
+    which tracks the fastest recent calls. Only calls started after the last decrease can decrease it again, so a
+    burst of failures of calls sent together counts once. An optional TokenBucket also caps the rate of calls.
+
+    Pass it to a Client as limiter, or share it between clients that call the same server.
+
+    Args:
+        initial: The initial limit.
+        min_limit: The lowest limit.
+        max_limit: The highest limit.
+        increase: The amount added to the limit per window of limit successful calls.
+        decrease: The factor applied to the limit on overload.
+        latency_tolerance: The latency, relative to the baseline, from which a call counts as overload.
+        rate: The maximum number of calls per second, or None.
+        burst: The burst of the rate limit.
+
+    """
+
+    def __init__(self, initial=4, min_limit=1, max_limit=64, increase=1, decrease=0.5, latency_tolerance=3.0,
+                 rate=None, burst=None):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.in_flight = 0
+        self.baseline = None
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        """Waits for a slot and returns the start time of the call, to be passed to release."""
+        if self.bucket is not None:
+            self.bucket.acquire()
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+        return time.monotonic()
+
+    def release(self, start, error=False):
+        """Frees the slot of a call and adapts the limit to its outcome.
+
+        Args:
+            start: The value returned by acquire.
+            error: If the call failed because of the server, e.g. a timeout or a 5xx response.
+
+        """
+        now = time.monotonic()
+        latency = now - start
+        with self._condition:
+            self.in_flight -= 1
+            if not error:
+                if self.baseline is None or latency < self.baseline:
+                    self.baseline = latency
+                else:
+                    # Let the baseline follow a server that became slower for good.
+                    self.baseline += (latency - self.baseline) * 0.01
+            overloaded = error or latency > self.baseline * self.latency_tolerance
+            if overloaded:
+                if start >= self._last_decrease:
+                    self.limit = max(self.min_limit, self.limit * self.decrease)
+                    self._last_decrease = now
+            else:
+                self.limit = min(self.max_limit, self.limit + self.increase / self.limit)
+            self._condition.notify_all()
+
+
+class ConcurrencyLimiter(object):
+    """Limits the calls in flight to a fixed number.
+
+    Args:
+        limit: The maximum number of calls in flight.
+
+    """
+
+    def __init__(self, limit):
+        self.limit = limit
+        self._semaphore = threading.BoundedSemaphore(limit)
+
+    def acquire(self):
+        self._semaphore.acquire()
+        return time.monotonic()
+
+    def release(self, start, error=False):
+        self._semaphore.release()
+
+
+class LimiterChain(object):
+    """Acquires several limiters in order and releases them in reverse order, e.g. a per host and a global one.
+
+    Put the most specific limiter first, so that calls waiting for a busy host do not hold a global slot.
+
+    Args:
+        *limiters: The limiters, with the acquire and release methods of AIMDLimiter.
+
+    """
+
+    def __init__(self, *limiters):
+        self.limiters = limiters
+
+    def acquire(self):
+        starts = []
+        try:
+            for limiter in self.limiters:
+                starts.append(limiter.acquire())
+        except BaseException:
+            for limiter, start in reversed(list(zip(self.limiters, starts))):
+                limiter.release(start)
+            raise
+        return starts
+
+    def release(self, starts, error=False):
+        for limiter, start in reversed(list(zip(self.limiters, starts))):
+            limiter.release(start, error)
@@ -0,0 +1,136 @@
+import bisect
+import logging
+import threading
+import time
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float('inf'))
+
+logger = logging.getLogger(__name__)
+
+
+class Call(object):
+    """Measures one API call. The client fills the sizes and timings it knows about."""
+
+    __slots__ = ('method', 'start', 'request_bytes', 'response_bytes', 'encode_time', 'decode_time', 'retries')
+
+    def __init__(self, method):
+        self.method = method
+        self.start = time.perf_counter()
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.encode_time = 0.0
+        self.decode_time = 0.0
+        self.retries = 0
+
+
+class MethodStats(object):
+    """The aggregated measures of the calls to one API method."""
+
+    __slots__ = ('calls', 'errors', 'latency_counts', 'latency_sum', 'request_bytes', 'response_bytes',
+                 'encode_time', 'decode_time', 'retries')
+
+    def __init__(self, buckets):
+        self.calls = 0
+        self.errors = {}
+        self.latency_counts = [0] * len(buckets)
+        self.latency_sum = 0.0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.encode_time = 0.0
+        self.decode_time = 0.0
+        self.retries = 0
+
+    def as_dict(self, buckets):
+        return {
+            'calls': self.calls,
+            'errors': dict(self.errors),
+            'latency_sum': self.latency_sum,
+            'latency_histogram': dict(zip(buckets, self.latency_counts)),
+            'request_bytes': self.request_bytes,
+            'response_bytes': self.response_bytes,
+            'encode_time': self.encode_time,
+            'decode_time': self.decode_time,
+            'retries': self.retries,
+        }
+
+
+class MetricsRegistry(object):
+    """Collects per API method call counts, latency histograms, payload sizes, JSON timings, retries and errors.
+
+    Pass it to a Client as metrics to instrument its calls. Without a registry the client does not measure anything.
+
+    Args:
+        exporters: The exporters that receive the snapshots on export.
+        buckets: The upper bounds, in seconds, of the buckets of the latency histograms.
+
+    """
+
+    def __init__(self, exporters=(), buckets=LATENCY_BUCKETS):
+        self.exporters = list(exporters)
+        self.buckets = tuple(buckets)
+        self._methods = {}
+        self._lock = threading.Lock()
+
+    def start(self, method):
+        return Call(method)
+
+    def finish(self, call, error=None):
+        """Aggregates a finished call. error is the exception it raised, if any."""
+        latency = time.perf_counter() - call.start
+        with self._lock:
+            stats = self._methods.get(call.method)
+            if stats is None:
+                stats = self._methods[call.method] = MethodStats(self.buckets)
+            stats.calls += 1
+            stats.latency_counts[bisect.bisect_left(self.buckets, latency)] += 1
+            stats.latency_sum += latency
+            stats.request_bytes += call.request_bytes
+            stats.response_bytes += call.response_bytes
+            stats.encode_time += call.encode_time
+            stats.decode_time += call.decode_time
+            stats.retries += call.retries
+            if error is not None:
+                # The SugarCRM error number if there is one, e.g. 11 for an invalid session.
+                number = getattr(error, 'number', None)
+                code = type(error).__name__ if number is None else str(number)
+                stats.errors[code] = stats.errors.get(code, 0) + 1
+
+    def snapshot(self):
+        """Returns a dict with the measures of every method."""
+        with self._lock:
+            return {method: stats.as_dict(self.buckets) for method, stats in self._methods.items()}
+
+    def reset(self):
+        with self._lock:
+            self._methods = {}
+
+    def export(self):
+        """Sends a snapshot to every exporter."""
+        snapshot = self.snapshot()
+        for exporter in self.exporters:
+            exporter.export(snapshot)
+        return snapshot
+
+
+class Exporter(object):
+    """Base class of the metrics exporters."""
+
+    def export(self, snapshot):
+        raise NotImplementedError
+
+
+class LoggingExporter(Exporter):
+    """Logs a line per API method with its calls, errors, mean latency and payload sizes."""
+
+    def __init__(self, logger=logger, level=logging.INFO):
+        self.logger = logger
+        self.level = level
+
+    def export(self, snapshot):
+        for method, stats in sorted(snapshot.items()):
+            calls = stats['calls'] or 1
+            self.logger.log(self.level, '%s calls=%d errors=%d retries=%d mean_latency=%.1fms request_bytes=%d '
+                            'response_bytes=%d encode=%.1fms decode=%.1fms', method, stats['calls'],
+                            sum(stats['errors'].values()), stats['retries'], stats['latency_sum'] / calls * 1000,
+                            stats['request_bytes'], stats['response_bytes'], stats['encode_time'] * 1000,
+                            stats['decode_time'] * 1000)
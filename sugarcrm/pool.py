@@ -0,0 +1,175 @@
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from urllib.parse import urlsplit
+
+import requests
+import requests.adapters
+
+from sugarcrm.client import Client
+from sugarcrm.limiter import AIMDLimiter, ConcurrencyLimiter, LimiterChain
+from sugarcrm.session import MemorySessionStore
+
+
+class ClientPool(object):
+    """Serves the clients of many SugarCRM instances and users from shared connections, sessions and limits.
+
+    There is one Client per instance URL and user name. They all send their requests through one requests session,
+    whose connections are pooled per host and bounded, and share a session store, so a session id is reused by the
+    clients created again after being evicted, or by other processes if the store is shared. Every call waits for a
+    slot of its host and then for a global slot.
+
+    A client is idle when it has no call in flight and was neither returned by get nor called for idle_timeout
+    seconds. Idle clients are evicted from the pool. An evicted client keeps working for its callers, within the
+    limits of its host, whose limiter is kept as long as any client of the host exists. The connections stay in the shared connection pool, which closes those of the least recently used hosts beyond
+    max_hosts.
+
+    Usage:
+        pool = ClientPool(max_in_flight=64, max_in_flight_per_host=4)
+        client = pool.get('SERVER_URL', 'USERNAME', 'PASSWORD')
+        client.get_entry_list('MODULE_NAME')
+
+    Args:
+        max_in_flight: The maximum number of calls in flight across every instance.
+        max_in_flight_per_host: The maximum number of calls in flight per host, which is also the number of
+            connections kept open per host.
+        max_hosts: The number of hosts whose connections are kept open. The least recently used are closed.
+        max_clients: The maximum number of clients. The least recently used are evicted when it is exceeded.
+        idle_timeout: The number of seconds after which an idle client is evicted.
+        adaptive: If the per host limit should adapt to the latency and errors of each host, see AIMDLimiter,
+            with max_in_flight_per_host as its highest value.
+        session_store: The store of the session ids. Defaults to a MemorySessionStore.
+        **client_kwargs: Any other keyword argument accepted by Client, e.g. timeout or metrics.
+
+    """
+
+    def __init__(self, max_in_flight=64, max_in_flight_per_host=4, max_hosts=100, max_clients=1000, idle_timeout=300,
+                 adaptive=False, session_store=None, **client_kwargs):
+        self.max_in_flight_per_host = max_in_flight_per_host
+        self.max_clients = max_clients
+        self.idle_timeout = idle_timeout
+        self.adaptive = adaptive
+        self.session_store = session_store if session_store is not None else MemorySessionStore()
+        self.client_kwargs = client_kwargs
+        self.requests_session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=max_hosts, pool_maxsize=max_in_flight_per_host,
+                                                pool_block=True)
+        self.requests_session.mount('http://', adapter)
+        self.requests_session.mount('https://', adapter)
+        self.limiter = ConcurrencyLimiter(max_in_flight)
+        # A host limiter lives as long as a client refers to it, evicted or not, so there is one per host.
+        self._host_limiters = weakref.WeakValueDictionary()
+        self._clients = OrderedDict()
+        self._next_scan = 0.0
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self):
+        return len(self._clients)
+
+    def get(self, url, username, password):
+        """Returns the client of an instance and user, creating it if needed. It logs in on its first call.
+
+        Args:
+            url: The URL of the instance.
+            username: The user name.
+            password: The password. A client created with another password is replaced, and does not share its
+                session.
+
+        Returns:
+            A Client.
+
+        """
+        key = (Client._rest_url(url), username)
+        with self._lock:
+            now = time.monotonic()
+            client = self._clients.get(key)
+            if client is not None and client.password != password:
+                self._remove(key)
+                client = None
+            if client is None:
+                host = self._host(key)
+                client = Client(url, username, password, requests_session=self.requests_session, lazy_login=True,
+                                session_store=self.session_store,
+                                limiter=_ClientLimiter(self._host_limiter(host), self.limiter), **self.client_kwargs)
+                self._clients[key] = client
+            client.limiter.last_used = now
+            self._clients.move_to_end(key)
+            # Looking for idle clients costs a pass over every client, so it is done at most once per second.
+            if len(self._clients) > self.max_clients or now >= self._next_scan:
+                self._evict(now)
+            return client
+
+    @staticmethod
+    def _host(key):
+        return urlsplit(key[0]).netloc.lower()
+
+    def _host_limiter(self, host):
+        limiter = self._host_limiters.get(host)
+        if limiter is None:
+            if self.adaptive:
+                limiter = AIMDLimiter(initial=min(4, self.max_in_flight_per_host),
+                                      max_limit=self.max_in_flight_per_host)
+            else:
+                limiter = ConcurrencyLimiter(self.max_in_flight_per_host)
+            self._host_limiters[host] = limiter
+        return limiter
+
+    def evict_idle(self):
+        """Evicts the clients that have been idle for idle_timeout seconds."""
+        with self._lock:
+            self._evict(time.monotonic())
+
+    def _evict(self, now):
+        self._next_scan = now + 1
+        for key, client in list(self._clients.items()):
+            if not client.limiter.in_flight and now - client.limiter.last_used >= self.idle_timeout:
+                self._remove(key)
+        excess = len(self._clients) - self.max_clients
+        if excess > 0:
+            def last_used(key):
+                limiter = self._clients[key].limiter
+                return bool(limiter.in_flight), limiter.last_used
+
+            for key in sorted(self._clients, key=last_used)[:excess]:
+                self._remove(key)
+
+    def _remove(self, key):
+        # The session id stays in the session store, so a new client of the same user does not log in again.
+        del self._clients[key]
+
+    def close(self):
+        """Evicts every client and closes the pooled connections."""
+        with self._lock:
+            for key in list(self._clients):
+                self._remove(key)
+            self.requests_session.close()
+
+
+class _ClientLimiter(LimiterChain):
+    """The limiters of a client of the pool, which also record when the client was last used."""
+
+    def __init__(self, *limiters):
+        super().__init__(*limiters)
+        self.in_flight = 0
+        self.last_used = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        starts = super().acquire()
+        with self._lock:
+            self.in_flight += 1
+            self.last_used = time.monotonic()
+        return starts
+
+    def release(self, starts, error=False):
+        with self._lock:
+            self.in_flight -= 1
+            self.last_used = time.monotonic()
+        super().release(starts, error)
@@ -0,0 +1,110 @@
+import math
+import re
+from decimal import Decimal
+
+from sugarcrm.exception import WrongParameter
+
+_IDENTIFIER = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)?$')
+
+
+def column(name, table=None):
+    """Returns a column reference, e.g. accounts.name, checking that it is a plain identifier.
+
+    Args:
+        name: The name of the column, optionally prefixed with its table.
+        table: The table of the column, if name is not prefixed.
+
+    """
+    if table and '.' not in name:
+        name = '{}.{}'.format(table, name)
+    if not isinstance(name, str) or not _IDENTIFIER.match(name):
+        raise WrongParameter('Invalid column name {!r}'.format(name))
+    return name
+
+
+def quote(value):
+    """Returns value as a SQL literal: NULL, a number or a quoted string.
+
+    Strings are quoted with their quotes doubled and their backslashes escaped, so a value cannot end the literal
+    on MySQL, whether it treats backslashes as escapes or not. A backslash is kept as two backslashes by databases
+    that do not treat it as an escape, e.g. MySQL in NO_BACKSLASH_ESCAPES mode or SQLite.
+
+    Raises:
+        WrongParameter: If value is not None, a bool, an int, a finite float or Decimal, or a str.
+
+    """
+    if value is None:
+        return 'NULL'
+    if isinstance(value, bool):
+        return str(int(value))
+    if isinstance(value, int):
+        return repr(int(value))
+    if isinstance(value, float) and math.isfinite(value):
+        return repr(float(value))
+    if isinstance(value, Decimal) and value.is_finite():
+        return str(value)
+    if not isinstance(value, str):
+        raise WrongParameter('Cannot quote {!r} as a SQL literal'.format(value))
+    return "'{}'".format(value.replace('\\', '\\\\').replace("'", "''"))
+
+
+def compare(name, op, value):
+    """Returns a comparison clause, e.g. compare('accounts.name', '=', "O'Brien")."""
+    if op not in ('=', '<>', '!=', '<', '<=', '>', '>=', 'LIKE', 'NOT LIKE'):
+        raise WrongParameter('Invalid operator {!r}'.format(op))
+    if value is None and op in ('=', '<>', '!='):
+        return '{} IS {}NULL'.format(column(name), '' if op == '=' else 'NOT ')
+    return '{} {} {}'.format(column(name), op, quote(value))
+
+
+def in_(name, values):
+    """Returns an IN clause, or a clause that is always false if values is empty."""
+    values = list(values)
+    if not values:
+        return '1 = 0'
+    return '{} IN ({})'.format(column(name), ', '.join(quote(value) for value in values))
+
+
+def and_(*clauses):
+    """Joins the non empty clauses with AND, parenthesizing each one."""
+    clauses = [clause for clause in clauses if clause]
+    if len(clauses) == 1:
+        return clauses[0]
+    return ' AND '.join('({})'.format(clause) for clause in clauses)
+
+
+def or_(*clauses):
+    """Joins the non empty clauses with OR, parenthesizing each one."""
+    clauses = [clause for clause in clauses if clause]
+    if len(clauses) == 1:
+        return clauses[0]
+    return ' OR '.join('({})'.format(clause) for clause in clauses)
+
+
+def order_by(names, table=None):
+    """Returns an ascending ORDER BY clause, without the phrase "order by", for the columns."""
+    return ', '.join(column(name, table) for name in names)
+
+
+def keyset_clause(names, values, table=None):
+    """Returns the clause selecting the rows after values in the ascending order of the columns.
+
+    For the columns (a, b) and the values (x, y) it is a >= x AND (a > x OR a = x AND b > y), which, unlike the
+    equivalent row comparison (a, b) > (x, y), lets MySQL seek an index on (a, b). The columns must not be NULL
+    and together must be unique, e.g. date_modified and id.
+
+    Args:
+        names: The names of the columns the rows are ordered by.
+        values: The values of those columns in the last row seen.
+        table: The table of the columns that are not prefixed with one.
+
+    """
+    names = [column(name, table) for name in names]
+    values = list(values)
+    if not names or len(names) != len(values):
+        raise WrongParameter('keyset_clause needs a value per column')
+    after = []
+    for i, (name, value) in enumerate(zip(names, values)):
+        equal = [compare(n, '=', v) for n, v in zip(names[:i], values[:i])]
+        after.append(and_(*(equal + [compare(name, '>', value)])))
+    return and_(compare(names[0], '>=', values[0]), or_(*after)) if len(names) > 1 else after[0]
@@ -0,0 +1,99 @@
+from collections import namedtuple
+from functools import lru_cache
+from sugarcrm.exception import WrongParameter
+
+DECODE_MODES = ('records', 'columns')
+
+
+@lru_cache(maxsize=256)
+def record_type(fields):
+    """Returns the record class for a tuple of field names.
+
+    Records are namedtuples: their values are stored in a tuple, with __slots__ = () and no per instance dict.
+    Field names that are not valid identifiers are renamed to their position, e.g. _3.
+    """
+    return namedtuple('Record', fields, rename=True)
+
+
+def _fields(entry_list, fields):
+    if not fields:
+        entry = next((entry for entry in entry_list if isinstance(entry.get('name_value_list'), dict)), entry_list[0])
+        fields = list(_name_value_dict(entry))
+    return ('id',) + tuple(field for field in fields if field != 'id')
+
+
+def _name_value_dict(entry):
+    name_value_list = entry.get('name_value_list') or {}
+    if isinstance(name_value_list, list):
+        # Deleted or inaccessible records come with a list of warnings instead of a dict.
+        name_value_list = {item['name']: item for item in name_value_list}
+    return name_value_list
+
+
+def _values(entry, fields):
+    name_value_list = _name_value_dict(entry)
+    values = [entry.get('id')]
+    for field in fields[1:]:
+        item = name_value_list.get(field)
+        values.append(item['value'] if item is not None else None)
+    return values
+
+
+def decode_dict(entry):
+    """Decodes an entry of an entry_list to a flat dict of field values, including its id."""
+    values = {name: item['value'] for name, item in _name_value_dict(entry).items()}
+    values.setdefault('id', entry.get('id'))
+    return values
+
+
+def decode_records(entry_list, fields=None):
+    """Decodes the entries of an entry_list to records with one attribute per field.
+
+    Args:
+        entry_list: The entry_list of a get_entry_list or get_entries response.
+        fields: The field names of the records. Defaults to the fields of the first entry. id is always the first.
+
+    Returns:
+        A list of records.
+
+    """
+    if not entry_list:
+        return []
+    fields = _fields(entry_list, fields)
+    make = record_type(fields)._make
+    return [make(_values(entry, fields)) for entry in entry_list]
+
+
+def decode_columns(entry_list, fields=None):
+    """Decodes the entries of an entry_list to a dict with a list of values per field.
+
+    Args:
+        entry_list: The entry_list of a get_entry_list or get_entries response.
+        fields: The field names of the columns. Defaults to the fields of the first entry. id is always the first.
+
+    Returns:
+        A dict.
+
+    """
+    if not entry_list:
+        return {}
+    fields = _fields(entry_list, fields)
+    columns = [[] for _ in fields]
+    append_id = columns[0].append
+    appends = list(zip(fields[1:], [column.append for column in columns[1:]]))
+    for entry in entry_list:
+        name_value_list = _name_value_dict(entry)
+        append_id(entry.get('id'))
+        for field, append in appends:
+            item = name_value_list.get(field)
+            append(item['value'] if item is not None else None)
+    return dict(zip(fields, columns))
+
+
+def decode_entry_list(entry_list, mode, fields=None):
+    """Decodes an entry_list with decode_records or decode_columns, according to mode."""
+    if mode == 'records':
+        return decode_records(entry_list, fields)
+    if mode == 'columns':
+        return decode_columns(entry_list, fields)
+    raise WrongParameter('decode must be one of {}'.format(', '.join(DECODE_MODES)))
@@ -0,0 +1,141 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+
+class SessionStore(object):
+    """Base class of the stores where session ids are cached so they can be reused by other clients.
+
+    The keys identify a server and the credentials of a user, see Client.session_key. The session ids let anyone
+    act as their user, so a store must only be readable by its owner.
+    """
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, session_id):
+        raise NotImplementedError
+
+    def delete(self, key, session_id=None):
+        """Removes the session id stored for key.
+
+        Args:
+            key: The key of the session.
+            session_id: If given, the session is only removed if it is still the stored one. This avoids discarding
+                a session that another client has just renewed.
+
+        """
+        raise NotImplementedError
+
+
+class MemorySessionStore(SessionStore):
+    """Stores the session ids in a dict shared by the clients of the same process."""
+
+    def __init__(self):
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        return self._sessions.get(key)
+
+    def set(self, key, session_id):
+        self._sessions[key] = session_id
+
+    def delete(self, key, session_id=None):
+        with self._lock:
+            if session_id is None or self._sessions.get(key) == session_id:
+                self._sessions.pop(key, None)
+
+
+class FileSessionStore(SessionStore):
+    """Stores the session ids in a JSON file, so they survive restarts and can be read by other processes.
+
+    The file is only readable by its owner.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _read(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write(self, sessions):
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)))
+        with os.fdopen(fd, 'w') as f:
+            json.dump(sessions, f)
+        os.replace(tmp, self.path)
+
+    def get(self, key):
+        return self._read().get(key)
+
+    def set(self, key, session_id):
+        with self._lock:
+            sessions = self._read()
+            sessions[key] = session_id
+            self._write(sessions)
+
+    def delete(self, key, session_id=None):
+        with self._lock:
+            sessions = self._read()
+            if key in sessions and (session_id is None or sessions[key] == session_id):
+                del sessions[key]
+                self._write(sessions)
+
+
+class SQLiteSessionStore(SessionStore):
+    """Stores the session ids in a SQLite database, safe to share between forked worker processes.
+
+    The database is created only readable by its owner.
+    """
+
+    def __init__(self, path, timeout=30):
+        self.path = path
+        self.timeout = timeout
+        os.close(os.open(path, os.O_RDWR | os.O_CREAT, 0o600))
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute('CREATE TABLE IF NOT EXISTS sessions (key TEXT PRIMARY KEY, session_id TEXT NOT NULL, '
+                             'updated_at REAL NOT NULL)')
+        finally:
+            conn.close()
+
+    def _connect(self):
+        # A connection per operation, so the store keeps working in processes forked after its creation.
+        return sqlite3.connect(self.path, timeout=self.timeout)
+
+    def get(self, key):
+        conn = self._connect()
+        try:
+            row = conn.execute('SELECT session_id FROM sessions WHERE key = ?', (key,)).fetchone()
+        finally:
+            conn.close()
+        return row[0] if row else None
+
+    def set(self, key, session_id):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute('INSERT OR REPLACE INTO sessions (key, session_id, updated_at) VALUES (?, ?, ?)',
+                             (key, session_id, time.time()))
+        finally:
+            conn.close()
+
+    def delete(self, key, session_id=None):
+        conn = self._connect()
+        try:
+            with conn:
+                if session_id is None:
+                    conn.execute('DELETE FROM sessions WHERE key = ?', (key,))
+                else:
+                    conn.execute('DELETE FROM sessions WHERE key = ? AND session_id = ?', (key, session_id))
+        finally:
+            conn.close()
@@ -0,0 +1,554 @@
+"""A local stand-in for the SugarCRM v4_1 REST API, to test and benchmark the client without a live CRM.
+
+It implements the method/rest_data protocol of rest.php over HTTP, backed by an in-memory SQLite database filled
+with generated records, so that query and order_by clauses are evaluated as SQL like the real server does.
+It is not meant to be exposed: the clauses sent by the clients are executed as they are.
+
+Usage:
+    with StandInServer(records=10000, latency=0.01) as server:
+        client = Client(server.url, 'admin', 'admin')
+
+It can also be run from the command line:
+    python -m sugarcrm.standin --records 10000 --latency 0.01 --port 8080
+
+"""
+import argparse
+import hashlib
+import json
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+COMMON_FIELDS = ['id', 'date_entered', 'date_modified', 'deleted', 'assigned_user_id']
+
+MODULES = {
+    'Accounts': ('accounts', ['name', 'industry', 'billing_address_city', 'phone_office', 'description']),
+    'Contacts': ('contacts', ['first_name', 'last_name', 'title', 'phone_work', 'account_id']),
+    'Leads': ('leads', ['first_name', 'last_name', 'status', 'lead_source', 'account_name']),
+    'Notes': ('notes', ['name', 'filename', 'file_mime_type', 'parent_type', 'parent_id', 'description']),
+}
+
+# (module, link): (related module, column of the related table, column of the module table)
+LINKS = {
+    ('Accounts', 'contacts'): ('Contacts', 'account_id', 'id'),
+    ('Contacts', 'accounts'): ('Accounts', 'id', 'account_id'),
+}
+
+SEARCH_FIELDS = {
+    'Accounts': ['name'],
+    'Contacts': ['first_name', 'last_name'],
+    'Leads': ['first_name', 'last_name', 'account_name'],
+}
+
+INDUSTRIES = ['Apparel', 'Banking', 'Chemicals', 'Education', 'Energy', 'Finance', 'Retail', 'Technology']
+CITIES = ['Bogota', 'Medellin', 'Cali', 'Madrid', 'Lima', 'Santiago', 'Quito', 'Mexico']
+FIRST_NAMES = ['Ana', 'Carlos', 'Diana', 'Felipe', 'Laura', 'Miguel', 'Sofia', 'Juan']
+LAST_NAMES = ['Ferrer', 'Garcia', 'Lopez', 'Martinez', 'Perez', 'Rodriguez', 'Sanchez', 'Torres']
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+class SugarError(Exception):
+    def __init__(self, number, name, description):
+        super().__init__(description)
+        self.response = {'name': name, 'number': number, 'description': description}
+
+
+class StandInServer(object):
+    """Serves the SugarCRM v4_1 REST API from generated data.
+
+    Args:
+        records: The number of records generated per module.
+        latency: The number of seconds every call is delayed, to simulate a remote server.
+        users: A dict of the user names and passwords that can log in. Defaults to {'admin': 'admin'}.
+        seed: The seed of the generated data.
+        host: The host to listen on.
+        port: The port to listen on. 0 picks a free port.
+
+    """
+
+    def __init__(self, records=1000, latency=0.0, users=None, seed=0, host='127.0.0.1', port=0):
+        self.latency = latency
+        self.users = users if users is not None else {'admin': 'admin'}
+        self.sessions = set()
+        self.calls = {}
+        self._faults = [0, None, None]
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(':memory:', check_same_thread=False)
+        self._create(records, random.Random(seed))
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return 'http://{}:{}/'.format(host, port)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def expire_sessions(self):
+        """Invalidates every session, as if they had timed out."""
+        self.sessions.clear()
+
+    def inject_faults(self, count, kind='error', methods=None):
+        """Makes the next calls fail as an overloaded or unreachable server would.
+
+        Args:
+            count: The number of calls that fail.
+            kind: 'error' to answer with a 500 response, 'drop' to close the connection without a response.
+            methods: The API methods that fail. Defaults to every method.
+
+        """
+        if kind not in ('error', 'drop'):
+            raise ValueError("kind must be 'error' or 'drop'")
+        with self._lock:
+            self._faults = [count, kind, set(methods) if methods else None]
+
+    @property
+    def pending_faults(self):
+        """The number of injected faults that have not happened yet."""
+        return self._faults[0]
+
+    def _take_fault(self, method):
+        with self._lock:
+            count, kind, methods = self._faults
+            if count and (methods is None or method in methods):
+                self._faults[0] -= 1
+                return kind
+        return None
+
+    @property
+    def total_calls(self):
+        return sum(self.calls.values())
+
+    def _create(self, records, rng):
+        start = datetime(2020, 1, 1)
+        account_ids = []
+        for module, (table, fields) in MODULES.items():
+            columns = COMMON_FIELDS + fields
+            self._db.execute('CREATE TABLE {} ({}, PRIMARY KEY (id))'.format(
+                table, ', '.join('{} {}'.format(c, 'INTEGER' if c == 'deleted' else 'TEXT') for c in columns)))
+            self._db.execute('CREATE INDEX {0}_date_modified ON {0} (date_modified, id)'.format(table))
+            self._db.execute('CREATE INDEX {0}_deleted_date_modified ON {0} (deleted, date_modified, id)'.format(table))
+            rows = []
+            for i in range(records):
+                entered = start + timedelta(seconds=rng.randint(0, 3 * 365 * 86400))
+                modified = entered + timedelta(seconds=rng.randint(0, 30 * 86400))
+                first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+                values = {
+                    'id': str(uuid.UUID(int=rng.getrandbits(128))),
+                    'date_entered': entered.strftime(DATE_FORMAT),
+                    'date_modified': modified.strftime(DATE_FORMAT),
+                    'deleted': 0,
+                    'assigned_user_id': '1',
+                    'name': '{} {} {}'.format(last, rng.choice(INDUSTRIES), i),
+                    'industry': rng.choice(INDUSTRIES),
+                    'billing_address_city': rng.choice(CITIES),
+                    'phone_office': '+57 {:07d}'.format(rng.randint(0, 9999999)),
+                    'description': 'Generated record {} of {}'.format(i, module),
+                    'first_name': first,
+                    'last_name': last,
+                    'title': rng.choice(['CEO', 'CTO', 'Sales', 'Support']),
+                    'phone_work': '+57 {:07d}'.format(rng.randint(0, 9999999)),
+                    'account_id': rng.choice(account_ids) if account_ids else '',
+                    'status': rng.choice(['New', 'Assigned', 'Converted']),
+                    'lead_source': rng.choice(['Web Site', 'Email', 'Partner']),
+                    'account_name': '{} {}'.format(last, rng.choice(INDUSTRIES)),
+                    'filename': '',
+                    'file_mime_type': '',
+                    'parent_type': '',
+                    'parent_id': '',
+                }
+                rows.append([values[c] for c in columns])
+            self._db.executemany('INSERT INTO {} VALUES ({})'.format(table, ', '.join('?' * len(columns))), rows)
+            if module == 'Accounts':
+                account_ids = [row[0] for row in rows]
+        self._db.execute('CREATE TABLE note_files (id TEXT PRIMARY KEY, file TEXT)')
+        self._db.commit()
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                form = parse_qs(self._read_body().decode('utf8'))
+                method = form.get('method', [''])[0]
+                fault = server._take_fault(method)
+                if fault == 'drop':
+                    self.close_connection = True
+                    return
+                if fault == 'error':
+                    body = b'Internal Server Error'
+                    self.send_response(500)
+                    self.send_header('Content-Type', 'text/html')
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return
+                try:
+                    params = json.loads(form.get('rest_data', ['null'])[0])
+                except ValueError:
+                    params = None
+                body = json.dumps(server.call(method, params)).encode('utf8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json; charset=UTF-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _read_body(self):
+                if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+                    chunks = []
+                    while True:
+                        size = int(self.rfile.readline().split(b';')[0], 16)
+                        if not size:
+                            self.rfile.readline()
+                            return b''.join(chunks)
+                        chunks.append(self.rfile.read(size))
+                        self.rfile.readline()
+                return self.rfile.read(int(self.headers.get('Content-Length', 0)))
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def call(self, method, params):
+        """Runs an API method and returns its response, as the handler of rest.php would."""
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.calls[method] = self.calls.get(method, 0) + 1
+            func = getattr(self, 'api_' + method, None)
+            if func is None:
+                return {'name': 'Invalid Method', 'number': 20, 'description': 'Unknown method {}'.format(method)}
+            try:
+                if method != 'login' and params[0] not in self.sessions:
+                    raise SugarError(11, 'Invalid Session ID', 'The session ID is invalid')
+                return func(*params[(method != 'login'):])
+            except SugarError as e:
+                return e.response
+            except sqlite3.Error as e:
+                return {'name': 'Database Error', 'number': 1000, 'description': str(e)}
+            except Exception as e:
+                # e.g. missing or malformed arguments, which would otherwise drop the connection.
+                return {'name': 'Internal Error', 'number': 1001,
+                        'description': '{}: {}'.format(type(e).__name__, e)}
+
+    # Helpers
+
+    def _module(self, module_name):
+        if module_name not in MODULES:
+            raise SugarError(20, 'Module Does Not Exist', 'This module is not available on this server')
+        table, fields = MODULES[module_name]
+        return table, COMMON_FIELDS + fields
+
+    @staticmethod
+    def _deleted_clauses(table, where, deleted):
+        # Like SugarBean::create_new_list_query, deleted selects only the deleted rows. None selects every row.
+        clauses = ['({})'.format(where)] if where else []
+        if deleted is not None:
+            clauses.append('{}.deleted = {}'.format(table, int(bool(deleted))))
+        return clauses
+
+    def _select(self, module_name, where='', order_by='', offset=0, limit=-1, deleted=False, args=()):
+        table, columns = self._module(module_name)
+        clauses = self._deleted_clauses(table, where, deleted)
+        sql = 'SELECT {} FROM {}'.format(', '.join(columns), table)
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        if order_by:
+            sql += ' ORDER BY ' + order_by
+        sql += ' LIMIT {} OFFSET {}'.format(int(limit), int(offset))
+        return [dict(zip(columns, row)) for row in self._db.execute(sql, args)]
+
+    def _count(self, module_name, where='', deleted=False):
+        table, _ = self._module(module_name)
+        clauses = self._deleted_clauses(table, where, deleted)
+        sql = 'SELECT COUNT(*) FROM {}'.format(table)
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        return self._db.execute(sql).fetchone()[0]
+
+    @staticmethod
+    def _name_value_list(row, select_fields):
+        fields = [f for f in select_fields if f in row] if select_fields else list(row)
+        return {f: {'name': f, 'value': '' if row[f] is None else str(row[f])} for f in fields}
+
+    def _entry(self, module_name, row, select_fields):
+        return {'id': row['id'], 'module_name': module_name,
+                'name_value_list': self._name_value_list(row, select_fields)}
+
+    def _related(self, module_name, row, link):
+        if (module_name, link) not in LINKS:
+            return None, []
+        related_module, related_column, column = LINKS[(module_name, link)]
+        related_table, _ = self._module(related_module)
+        rows = self._select(related_module, '{}.{} = ?'.format(related_table, related_column), args=(row[column],))
+        return related_module, rows
+
+    def _relationships(self, module_name, row, link_name_to_fields_array):
+        link_list = []
+        for link in link_name_to_fields_array or []:
+            _, rows = self._related(module_name, row, link['name'])
+            link_list.append({'name': link['name'], 'records': [
+                {'link_value': self._name_value_list(r, link['value'])} for r in rows]})
+        return {'link_list': link_list}
+
+    def _entries(self, module_name, rows, select_fields, link_name_to_fields_array):
+        return {
+            'entry_list': [self._entry(module_name, row, select_fields) for row in rows],
+            'relationship_list': [self._relationships(module_name, row, link_name_to_fields_array)
+                                  for row in rows] if link_name_to_fields_array else [],
+        }
+
+    def _save(self, module_name, name_value_list):
+        table, columns = self._module(module_name)
+        if isinstance(name_value_list, dict):
+            name_value_list = list(name_value_list.values())
+        values = {item['name']: item['value'] for item in name_value_list}
+        now = datetime.utcnow().strftime(DATE_FORMAT)
+        existing = self._select(module_name, '{}.id = ?'.format(table), deleted=None, args=(values.get('id', ''),))
+        row = existing[0] if existing else dict.fromkeys(columns, '')
+        if not existing:
+            row.update(id=values.get('id') or str(uuid.uuid4()), date_entered=now, assigned_user_id='1')
+        row.update({k: v for k, v in values.items() if k in row and k != 'id'})
+        row['deleted'] = int(row.get('deleted') or 0)
+        row['date_modified'] = now
+        self._db.execute('INSERT OR REPLACE INTO {} ({}) VALUES ({})'.format(
+            table, ', '.join(columns), ', '.join('?' * len(columns))), [row[c] for c in columns])
+        return row['id']
+
+    # API methods
+
+    def api_login(self, user_auth, application_name='', name_value_list=None):
+        password = self.users.get(user_auth.get('user_name'))
+        if password is None or hashlib.md5(password.encode('utf8')).hexdigest() != user_auth.get('password'):
+            raise SugarError(10, 'Invalid Login', 'Login attempt failed please check the username and password')
+        session_id = uuid.uuid4().hex
+        self.sessions.add(session_id)
+        return {'id': session_id, 'module_name': 'Users', 'name_value_list': {
+            'user_id': {'name': 'user_id', 'value': '1'},
+            'user_name': {'name': 'user_name', 'value': user_auth['user_name']}}}
+
+    def api_logout(self):
+        return None
+
+    def api_get_available_modules(self, filter='default'):
+        return {'modules': [{'module_key': m, 'module_label': m, 'favorite_enabled': False, 'acls': []}
+                            for m in MODULES]}
+
+    def _module_fields(self, module_name, fields=None):
+        table, columns = self._module(module_name)
+        return {
+            'module_name': module_name,
+            'table_name': table,
+            'module_fields': {c: {'name': c, 'type': 'id' if c.endswith('id') else 'varchar', 'label': c,
+                                  'required': int(c == 'id'), 'options': [], 'related_module': '',
+                                  'calculated': False, 'len': 255}
+                              for c in columns if not fields or c in fields},
+            'link_fields': {link: {'name': link, 'type': 'link', 'relationship': link, 'module': related[0],
+                                   'bean_name': related[0]}
+                            for (module, link), related in LINKS.items() if module == module_name},
+        }
+
+    def api_get_module_fields(self, module_name, fields=None):
+        return self._module_fields(module_name, fields)
+
+    def api_get_module_fields_md5(self, module_names):
+        return {m: hashlib.md5(json.dumps(self._module_fields(m), sort_keys=True).encode()).hexdigest()
+                for m in module_names}
+
+    def api_get_module_layout(self, module_names, types, views, acl_check=True, md5=False):
+        layouts = {}
+        for module_name in module_names:
+            panels = {'panels': [[field] for field in self._module(module_name)[1]]}
+            layouts[module_name] = {t: {v: panels for v in views} for t in types}
+        if md5:
+            digest = hashlib.md5(json.dumps(layouts, sort_keys=True).encode()).hexdigest()
+            return {m: {t: {v: digest for v in views} for t in types} for m in module_names}
+        return layouts
+
+    def api_get_module_layout_md5(self, module_names, types, views, acl_check=True):
+        return self.api_get_module_layout(module_names, types, views, acl_check, md5=True)
+
+    def api_get_entries_count(self, module_name, query='', deleted=0):
+        return {'result_count': self._count(module_name, query, bool(deleted))}
+
+    def api_get_entry_list(self, module_name, query='', order_by='', offset=0, select_fields=None,
+                           link_name_to_fields_array=None, max_results=0, deleted=0, favorites=False):
+        offset = int(offset or 0)
+        rows = self._select(module_name, query, order_by, offset, int(max_results) or 20, bool(deleted))
+        response = {
+            'result_count': len(rows),
+            'total_count': str(self._count(module_name, query, bool(deleted))),
+            'next_offset': offset + len(rows),
+        }
+        response.update(self._entries(module_name, rows, select_fields, link_name_to_fields_array))
+        return response
+
+    def api_get_entries(self, module_name, ids, select_fields=None, link_name_to_fields_array=None,
+                        track_view=False):
+        table, _ = self._module(module_name)
+        rows = {}
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            for row in self._select(module_name, '{}.id IN ({})'.format(table, ', '.join('?' * len(chunk))),
+                                    args=chunk):
+                rows[row['id']] = row
+        entry_list, relationship_list = [], []
+        for id in ids:
+            if id in rows:
+                entry_list.append(self._entry(module_name, rows[id], select_fields))
+                if link_name_to_fields_array:
+                    relationship_list.append(self._relationships(module_name, rows[id], link_name_to_fields_array))
+            else:
+                entry_list.append({'id': id, 'module_name': module_name, 'name_value_list': [
+                    {'name': 'warning', 'value': 'Access to this object is denied since it has been deleted or '
+                                                 'does not exist'},
+                    {'name': 'deleted', 'value': '1'}]})
+                if link_name_to_fields_array:
+                    relationship_list.append({'link_list': []})
+        return {'entry_list': entry_list, 'relationship_list': relationship_list}
+
+    def api_get_entry(self, module_name, id, select_fields=None, link_name_to_fields_array=None, track_view=False):
+        return self.api_get_entries(module_name, [id], select_fields, link_name_to_fields_array, track_view)
+
+    def api_set_entry(self, module_name, name_value_list):
+        id = self._save(module_name, name_value_list)
+        self._db.commit()
+        return {'id': id, 'entry_list': {item['name']: item for item in name_value_list}}
+
+    def api_set_entries(self, module_name, name_value_lists):
+        ids = [self._save(module_name, name_value_list) for name_value_list in name_value_lists]
+        self._db.commit()
+        return {'ids': ids}
+
+    def api_get_relationships(self, module_name, module_id, link_field_name, related_module_query='',
+                              related_fields=None, related_module_link_name_to_fields_array=None, deleted=0,
+                              order_by='', offset=0, limit=False):
+        table, _ = self._module(module_name)
+        rows = self._select(module_name, '{}.id = ?'.format(table), args=(module_id,))
+        if not rows or (module_name, link_field_name) not in LINKS:
+            return {'entry_list': [], 'relationship_list': []}
+        related_module, related_column, column = LINKS[(module_name, link_field_name)]
+        related_table, _ = self._module(related_module)
+        where = '{}.{} = ?'.format(related_table, related_column)
+        if related_module_query:
+            where += ' AND ({})'.format(related_module_query)
+        related = self._select(related_module, where, order_by, int(offset or 0), int(limit) if limit else -1,
+                               None if deleted else False, args=(rows[0][column],))
+        return self._entries(related_module, related, related_fields, related_module_link_name_to_fields_array)
+
+    def api_set_relationship(self, module_name, module_id, link_field_name, related_ids, name_value_list=None,
+                             delete=0):
+        if (module_name, link_field_name) not in LINKS:
+            return {'created': 0, 'failed': len(related_ids), 'deleted': 0}
+        related_module, related_column, column = LINKS[(module_name, link_field_name)]
+        for related_id in related_ids:
+            if column == 'id':
+                self._save(related_module, [{'name': 'id', 'value': related_id},
+                                            {'name': related_column, 'value': '' if delete else module_id}])
+            else:
+                self._save(module_name, [{'name': 'id', 'value': module_id},
+                                         {'name': column, 'value': '' if delete else related_id}])
+        self._db.commit()
+        return {'created': 0 if delete else len(related_ids), 'failed': 0, 'deleted': len(related_ids) if delete else 0}
+
+    def api_search_by_module(self, search_string, modules, offset=0, max_results=0, assigned_user_id='',
+                             select_fields=None, unified_search_only=False, favorites=False):
+        entry_list = []
+        for module_name in modules:
+            if module_name not in SEARCH_FIELDS:
+                continue
+            table, _ = self._module(module_name)
+            where = ' OR '.join('{}.{} LIKE ?'.format(table, f) for f in SEARCH_FIELDS[module_name])
+            args = ['%{}%'.format(search_string)] * len(SEARCH_FIELDS[module_name])
+            rows = self._select(module_name, where, '{}.date_modified DESC'.format(table), int(offset or 0),
+                                int(max_results) or 20, args=args)
+            fields = select_fields or ['id'] + SEARCH_FIELDS[module_name]
+            entry_list.append({'name': module_name, 'records': [self._name_value_list(row, fields) for row in rows]})
+        return {'entry_list': entry_list}
+
+    def api_set_note_attachment(self, note):
+        rows = self._select('Notes', 'notes.id = ?', args=(note.get('id', ''),))
+        if not rows:
+            raise SugarError(40, 'Access Denied', 'You do not have access')
+        self._save('Notes', [{'name': 'id', 'value': note['id']}, {'name': 'filename', 'value': note['filename']}])
+        self._db.execute('INSERT OR REPLACE INTO note_files (id, file) VALUES (?, ?)', (note['id'], note['file']))
+        self._db.commit()
+        return {'id': note['id']}
+
+    def api_get_note_attachment(self, id):
+        rows = self._select('Notes', 'notes.id = ?', args=(id,))
+        if not rows:
+            raise SugarError(40, 'Access Denied', 'You do not have access')
+        row = self._db.execute('SELECT file FROM note_files WHERE id = ?', (id,)).fetchone()
+        return {'note_attachment': {'id': id, 'filename': rows[0]['filename'], 'file': row[0] if row else '',
+                                    'related_module_id': rows[0]['parent_id'],
+                                    'related_module_name': rows[0]['parent_type']}}
+
+    def api_get_modified_relationships(self, module_name, related_module, from_date, to_date, offset=0,
+                                       max_results=0, deleted=0, module_user_id='', select_fields=None,
+                                       relationship_name='', deletion_date=''):
+        # The related records linked to a record of module_name, or to module_user_id if given, that were modified
+        # in the range. As with get_entry_list, deleted selects only the deleted ones.
+        links = [(link, column) for (module, link), (related, _, column) in LINKS.items()
+                 if module == module_name and related == related_module]
+        if not links:
+            raise SugarError(20, 'Module Does Not Exist', 'There is no relationship between these modules')
+        link, column = links[0]
+        table, _ = self._module(module_name)
+        related_table, _ = self._module(related_module)
+        _, related_column, _ = LINKS[(module_name, link)]
+        where = ('{0}.{1} IN (SELECT {2}.{3} FROM {2} WHERE {2}.{3} <> \'\'{4}) '
+                 'AND {0}.date_modified >= ? AND {0}.date_modified <= ?').format(
+            related_table, related_column, table, column, ' AND {}.id = ?'.format(table) if module_user_id else '')
+        args = ((module_user_id,) if module_user_id else ()) + (from_date, to_date)
+        rows = self._select(related_module, where, '{0}.date_modified, {0}.id'.format(related_table),
+                            int(offset or 0), int(max_results) or 20, deleted, args=args)
+        return {'result_count': len(rows), 'next_offset': int(offset or 0) + len(rows),
+                'entry_list': [self._entry(related_module, row, select_fields) for row in rows],
+                'error': {'number': 0, 'name': 'No Error', 'description': 'No Error'}}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Runs a local stand-in of the SugarCRM v4_1 REST API.')
+    parser.add_argument('--records', type=int, default=1000, help='records generated per module')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds every call is delayed')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    args = parser.parse_args()
+    server = StandInServer(records=args.records, latency=args.latency, host=args.host, port=args.port)
+    print('Serving {} (user admin, password admin)'.format(server.url))
+    server.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
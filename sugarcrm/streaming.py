@@ -0,0 +1,311 @@
+import base64
+import codecs
+import json
+import re
+import uuid
+from urllib.parse import quote_plus, urlencode
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\n\r'
+
+
+class JSONStream(object):
+    """Decodes the items of a list member of a JSON object incrementally, while its body is being received.
+
+    Only the item being decoded is held in memory, plus the members of the object other than the list, which are
+    stored in meta as they are decoded. With the SugarCRM responses, result_count, total_count and next_offset
+    precede entry_list, so they are available in meta once the stream is opened.
+
+    Args:
+        chunks: An iterable of bytes, e.g. the iter_content of a streamed requests response.
+        key: The name of the list member whose items are yielded.
+        on_close: A callable invoked when the stream is exhausted or closed, e.g. to release the connection.
+
+    """
+
+    def __init__(self, chunks, key='entry_list', on_close=None):
+        self.key = key
+        self.meta = {}
+        self._chunks = iter(chunks)
+        self._on_close = on_close
+        self._utf8 = codecs.getincrementaldecoder('utf-8')()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+        self._opened = False
+        self._in_list = False
+        self._closed = False
+
+    def open(self):
+        """Decodes the body until the first item of the list, or until its end if the list is missing.
+
+        Returns:
+            True if the list was found.
+
+        """
+        if not self._opened:
+            self._opened = True
+            if self._skip_whitespace() != '{':
+                raise ValueError('Expected a JSON object, got {!r}'.format(self._buffer[self._pos:self._pos + 80]))
+            self._pos += 1
+            self._in_list = self._read_members()
+            if not self._in_list:
+                self.close()
+        return self._in_list
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            if self._on_close is not None:
+                self._on_close()
+
+    def __iter__(self):
+        self.open()
+        if not self._in_list:
+            return
+        try:
+            first = True
+            while True:
+                char = self._skip_whitespace()
+                if char == ']':
+                    self._pos += 1
+                    break
+                if not first:
+                    if char != ',':
+                        raise ValueError('Expected , or ] in {}'.format(self.key))
+                    self._pos += 1
+                    self._skip_whitespace()
+                first = False
+                yield self._value()
+            self._in_list = False
+            self._read_members()
+        finally:
+            self.close()
+
+    def _read_members(self):
+        """Decodes members into meta until the list member starts, returning True, or the object ends."""
+        while True:
+            char = self._skip_whitespace()
+            if char == '}':
+                self._pos += 1
+                return False
+            if char == ',':
+                self._pos += 1
+                self._skip_whitespace()
+            name = self._value()
+            if self._skip_whitespace() != ':':
+                raise ValueError('Expected : after {!r}'.format(name))
+            self._pos += 1
+            if name == self.key and self._skip_whitespace() == '[':
+                self._pos += 1
+                return True
+            self._skip_whitespace()
+            self.meta[name] = self._value()
+
+    def _fill(self, size=0):
+        """Reads chunks until at least size more characters are buffered. Returns False at the end of the body."""
+        if self._pos:
+            self._buffer = self._buffer[self._pos:]
+            self._pos = 0
+        read = 0
+        while not self._eof:
+            try:
+                chunk = next(self._chunks)
+            except StopIteration:
+                self._eof = True
+                text = self._utf8.decode(b'', final=True)
+            else:
+                text = self._utf8.decode(chunk)
+            self._buffer += text
+            read += len(text)
+            if read > size:
+                return True
+        return read > 0
+
+    def _skip_whitespace(self):
+        while True:
+            buffer = self._buffer
+            length = len(buffer)
+            pos = self._pos
+            while pos < length and buffer[pos] in _WHITESPACE:
+                pos += 1
+            self._pos = pos
+            if pos < length:
+                return buffer[pos]
+            if not self._fill():
+                raise ValueError('Unexpected end of JSON body')
+
+    def _value(self):
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self._buffer, self._pos)
+            except ValueError:
+                if self._eof:
+                    raise
+            else:
+                # A number at the end of the buffer may continue in the next chunk.
+                if end < len(self._buffer) or self._eof:
+                    self._pos = end
+                    return value
+            # Read at least as much as is buffered, so that long values are decoded in amortized linear time.
+            self._fill(len(self._buffer) - self._pos)
+
+
+BASE64_CHUNK_SIZE = 48 * 1024  # A multiple of 3, so that the chunks are encoded without padding.
+
+# Base64 characters that are escaped in an urlencoded form.
+_FORM_ESCAPES = ((b'+', b'%2B'), (b'/', b'%2F'), (b'=', b'%3D'))
+
+
+class Base64File(object):
+    """Base64 encodes a file one chunk at a time while it is sent, e.g. as the content of a note attachment.
+
+    Args:
+        source: A path or a binary file object. A file object is read from its position when the Base64File is
+            created, which is restored if the file is sent again, e.g. after a new login. A file object that is not
+            seekable can only be sent once.
+        chunk_size: The number of bytes read at a time. Rounded down to a multiple of 3.
+
+    """
+
+    def __init__(self, source, chunk_size=BASE64_CHUNK_SIZE):
+        self.source = source
+        self.chunk_size = max(chunk_size - chunk_size % 3, 3)
+        self._start = None
+        self._sent = False
+        if hasattr(source, 'read'):
+            try:
+                if getattr(source, 'seekable', lambda: True)():
+                    self._start = source.tell()
+            except (AttributeError, OSError):
+                pass
+
+    @property
+    def rewindable(self):
+        """If the file can be sent again: a path or a seekable file object."""
+        return not hasattr(self.source, 'read') or self._start is not None
+
+    def __iter__(self):
+        if not hasattr(self.source, 'read'):
+            with open(self.source, 'rb') as f:
+                yield from self._encode(f)
+            return
+        if self._start is not None:
+            self.source.seek(self._start)
+        elif self._sent:
+            raise ValueError('The file cannot be sent again, as it is not seekable')
+        self._sent = True
+        yield from self._encode(self.source)
+
+    def _encode(self, f):
+        rest = b''
+        while True:
+            data = f.read(self.chunk_size)
+            if not data:
+                break
+            data = rest + data
+            end = len(data) - len(data) % 3
+            rest = data[end:]
+            if end:
+                yield base64.b64encode(data[:end])
+        if rest:
+            yield base64.b64encode(rest)
+
+
+def iter_form(fields, name, value):
+    """Returns an iterator over the chunks of an urlencoded form body whose name field is value encoded as JSON.
+
+    Every Base64File in value is encoded as a JSON string while the body is sent, so the file is never held in
+    memory. The rest of value is encoded at once, so a value that is not JSON serializable raises a TypeError before
+    anything is sent.
+
+    Args:
+        fields: A dict of the other fields of the form.
+        name: The name of the JSON field, which is the last one of the form.
+        value: The value to encode as JSON.
+
+    """
+    placeholder = 'base64-file-{}'.format(uuid.uuid4().hex)
+    files = []
+
+    def default(o):
+        if isinstance(o, Base64File):
+            files.append(o)
+            return placeholder
+        raise TypeError('Object of type {} is not JSON serializable'.format(type(o).__name__))
+
+    parts = json.dumps(value, default=default).split(placeholder)
+    return _iter_form_parts(fields, name, parts, files)
+
+
+def _iter_form_parts(fields, name, parts, files):
+    yield '{}&{}={}'.format(urlencode(fields), quote_plus(name), quote_plus(parts[0])).encode('ascii')
+    for file, part in zip(files, parts[1:]):
+        for chunk in file:
+            for char, escape in _FORM_ESCAPES:
+                chunk = chunk.replace(char, escape)
+            yield chunk
+        if part:
+            yield quote_plus(part).encode('ascii')
+
+
+_BASE64_STRING_ESCAPES = ((b'\\/', b'/'), (b'\\n', b''), (b'\\r', b''))
+
+
+def decode_base64_member(chunks, key, out):
+    """Writes the decoded base64 string member key of a JSON body to out, as the body is received.
+
+    Only one chunk and the other members are held in memory. The member may be nested in other objects, but must
+    occur once.
+
+    Args:
+        chunks: An iterable of bytes, e.g. the iter_content of a streamed requests response.
+        key: The name of the base64 string member.
+        out: A binary file object where the decoded bytes are written.
+
+    Returns:
+        The JSON body, with an empty string as the value of the member.
+
+    """
+    start = re.compile(br'"' + re.escape(key.encode('utf8')) + br'"\s*:\s*"')
+    parts = []
+    buffer = b''
+    chunks = iter(chunks)
+    for chunk in chunks:
+        buffer += chunk
+        match = start.search(buffer)
+        if match is not None:
+            parts.append(buffer[:match.end()])
+            buffer = buffer[match.end():]
+            break
+    else:
+        return json.loads(buffer.decode('utf8'))
+
+    pending = b''
+    while True:
+        end = buffer.find(b'"')
+        if end >= 0:
+            data, buffer = buffer[:end], buffer[end:]
+        elif buffer.endswith(b'\\'):
+            # An escape sequence may be split between two chunks.
+            data, buffer = buffer[:-1], b'\\'
+        else:
+            data, buffer = buffer, b''
+        for escape, char in _BASE64_STRING_ESCAPES:
+            data = data.replace(escape, char)
+        pending += data
+        size = len(pending) - len(pending) % 4
+        if size:
+            out.write(base64.b64decode(pending[:size]))
+            pending = pending[size:]
+        if end >= 0:
+            parts.append(buffer)
+            break
+        try:
+            buffer += next(chunks)
+        except StopIteration:
+            raise ValueError('Unexpected end of JSON body in {}'.format(key))
+    if pending:
+        out.write(base64.b64decode(pending + b'=' * (-len(pending) % 4)))
+    parts.extend(chunks)
+    return json.loads(b''.join(parts).decode('utf8'))
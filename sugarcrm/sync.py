@@ -0,0 +1,194 @@
+import json
+import sqlite3
+from collections import namedtuple
+from datetime import datetime
+
+from sugarcrm.query import and_, column, compare
+from sugarcrm.records import decode_dict
+
+SyncResult = namedtuple('SyncResult', ['upserted', 'deleted', 'watermark'])
+SyncResult.__doc__ = """The number of records upserted and deleted by a sync, and the new watermark."""
+
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    module TEXT NOT NULL,
+    id TEXT NOT NULL,
+    date_modified TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (module, id)
+);
+CREATE INDEX IF NOT EXISTS records_date_modified ON records (module, date_modified);
+CREATE TABLE IF NOT EXISTS relationships (
+    module TEXT NOT NULL,
+    related_module TEXT NOT NULL,
+    id TEXT NOT NULL,
+    date_modified TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (module, related_module, id)
+);
+CREATE INDEX IF NOT EXISTS relationships_date_modified ON relationships (module, related_module, date_modified);
+CREATE TABLE IF NOT EXISTS watermarks (
+    name TEXT PRIMARY KEY,
+    date_modified TEXT NOT NULL
+);
+"""
+
+
+class SyncEngine(object):
+    """Mirrors modules in a local SQLite database, fetching only what changed since the previous sync.
+
+    A sync makes two passes over a module, as SugarCRM returns either the live records or only the deleted ones: one
+    upserts the live records in the mirror and the other removes the deleted ones. Each pass has its own
+    date_modified watermark, requests the records modified at or after it and moves it forward page by page, so an
+    interrupted sync resumes where it stopped.
+
+    Args:
+        client: The Client used to request the records.
+        path: The path of the SQLite database.
+        page_size: The number of records requested per call.
+
+    """
+
+    def __init__(self, client, path, page_size=500):
+        self.client = client
+        self.page_size = page_size
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def watermark(self, name):
+        """Returns the date_modified watermark of a module, or None if it was never synced.
+
+        The watermark of the deleted records of a module is named after the module followed by ':deleted'.
+        """
+        row = self.conn.execute('SELECT date_modified FROM watermarks WHERE name = ?', (name,)).fetchone()
+        return row[0] if row else None
+
+    def get(self, module_name, id):
+        """Returns the mirrored record of a module as a dict, or None."""
+        row = self.conn.execute('SELECT data FROM records WHERE module = ? AND id = ?', (module_name, id)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def count(self, module_name):
+        return self.conn.execute('SELECT COUNT(*) FROM records WHERE module = ?', (module_name,)).fetchone()[0]
+
+    def sync(self, module_name, *, table=None, select_fields=[], query=''):
+        """Brings the mirror of a module up to date.
+
+        Args:
+            module_name: The name of the module to mirror.
+            table: The database table of the module, used to qualify the columns of the query. Defaults to the
+                module name in lower case.
+            select_fields: The list of fields to mirror. Specifying an empty list mirrors all fields.
+            query: An additional SQL WHERE clause without the word "where".
+
+        Returns:
+            A SyncResult, whose watermark is the one of the live records.
+
+        """
+        table = table or module_name.lower()
+        if select_fields:
+            select_fields = list(dict.fromkeys(['id', 'date_modified', 'deleted'] + list(select_fields)))
+        upserted, _, watermark = self._sync_pass(module_name, module_name, table, select_fields, query, False)
+        # The pass over the deleted records only needs the fields used to page and to remove them.
+        _, deleted, _ = self._sync_pass(module_name, module_name + ':deleted', table,
+                                        ['id', 'date_modified', 'deleted'], query, True)
+        return SyncResult(upserted, deleted, watermark)
+
+    def _sync_pass(self, module_name, name, table, select_fields, query, deleted):
+        watermark = self.watermark(name)
+        # Records modified in the same second as the watermark may be in a page that was not fetched yet.
+        since = compare(column('date_modified', table), '>=', watermark) if watermark else ''
+        entries = self.client.iter_entry_list(
+            module_name, page_size=self.page_size, pagination='keyset', keys=('date_modified', 'id'), table=table,
+            query=and_(query, since), select_fields=select_fields, deleted=deleted)
+
+        upserted = removed = 0
+        batch = []
+        for entry in entries:
+            batch.append(decode_dict(entry))
+            if len(batch) >= self.page_size:
+                u, d, watermark = self._apply_records(module_name, name, batch, watermark)
+                upserted, removed, batch = upserted + u, removed + d, []
+        if batch:
+            u, d, watermark = self._apply_records(module_name, name, batch, watermark)
+            upserted, removed = upserted + u, removed + d
+        return upserted, removed, watermark
+
+    def _apply_records(self, module_name, name, records, watermark):
+        upserts = [(module_name, r['id'], r.get('date_modified'), json.dumps(r)) for r in records
+                   if str(r.get('deleted', '0')) != '1']
+        deletes = [(module_name, r['id']) for r in records if str(r.get('deleted', '0')) == '1']
+        watermark = max([watermark or ''] + [r['date_modified'] for r in records if r.get('date_modified')]) or None
+        with self.conn:
+            self.conn.executemany('INSERT OR REPLACE INTO records (module, id, date_modified, data) '
+                                  'VALUES (?, ?, ?, ?)', upserts)
+            self.conn.executemany('DELETE FROM records WHERE module = ? AND id = ?', deletes)
+            if watermark:
+                self._set_watermark(name, watermark)
+        return len(upserts), len(deletes), watermark
+
+    def sync_relationships(self, module_name, related_module, *, relationship_name='', select_fields=[],
+                           to_date=None):
+        """Brings the mirror of the relationships between module_name and related_module up to date.
+
+        Args:
+            module_name: The name of the module of the primary records, e.g. 'Users'.
+            related_module: The name of the related module, e.g. 'Meetings', 'Calls' or 'Contacts'.
+            relationship_name: The name of the relationship. Defaults to the one between both modules.
+            select_fields: The list of fields of the related records to mirror.
+            to_date: The end of the synced range, formatted as 'Y-m-d H:i:s'. Defaults to now, in UTC.
+
+        Returns:
+            A SyncResult.
+
+        """
+        name = '{}:{}'.format(module_name, related_module)
+        from_date = self.watermark(name) or '1970-01-01 00:00:00'
+        to_date = to_date or datetime.utcnow().strftime(DATE_FORMAT)
+        if select_fields:
+            select_fields = list(dict.fromkeys(['id', 'date_modified', 'deleted'] + list(select_fields)))
+        upserted = deleted = 0
+        # As with get_entry_list, deleted selects only the deleted relationships, so they need a pass of their own.
+        for pass_deleted in (False, True):
+            offset = 0
+            while True:
+                response = self.client.get_modified_relationships(
+                    module_name, related_module, from_date, to_date, offset=offset, max_results=self.page_size,
+                    deleted=pass_deleted, select_fields=select_fields, relationship_name=relationship_name)
+                entries = response.get('entry_list') or []
+                u, d = self._apply_relationships(module_name, related_module, [decode_dict(e) for e in entries])
+                upserted, deleted = upserted + u, deleted + d
+                next_offset = int(response.get('next_offset', offset + len(entries)))
+                if len(entries) < self.page_size or next_offset <= offset:
+                    break
+                offset = next_offset
+        # The next sync starts at to_date again, since more changes may happen within that same second.
+        with self.conn:
+            self._set_watermark(name, to_date)
+        return SyncResult(upserted, deleted, to_date)
+
+    def _apply_relationships(self, module_name, related_module, records):
+        upserts = [(module_name, related_module, r['id'], r.get('date_modified'), json.dumps(r))
+                   for r in records if str(r.get('deleted', '0')) != '1']
+        deletes = [(module_name, related_module, r['id']) for r in records if str(r.get('deleted', '0')) == '1']
+        with self.conn:
+            self.conn.executemany('INSERT OR REPLACE INTO relationships '
+                                  '(module, related_module, id, date_modified, data) VALUES (?, ?, ?, ?, ?)', upserts)
+            self.conn.executemany('DELETE FROM relationships WHERE module = ? AND related_module = ? AND id = ?',
+                                  deletes)
+        return len(upserts), len(deletes)
+
+    def get_relationship(self, module_name, related_module, id):
+        """Returns the mirrored related record of a relationship as a dict, or None."""
+        row = self.conn.execute('SELECT data FROM relationships WHERE module = ? AND related_module = ? AND id = ?',
+                                (module_name, related_module, id)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _set_watermark(self, name, date_modified):
+        self.conn.execute('INSERT OR REPLACE INTO watermarks (name, date_modified) VALUES (?, ?)',
+                          (name, date_modified))
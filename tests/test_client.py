@@ -1,6 +1,7 @@
 import os
 from unittest import TestCase
 from sugarcrm.client import Client
+from sugarcrm.session import MemorySessionStore
 
 
 class SugarCRMTestCases(TestCase):
@@ -30,3 +31,45 @@ class SugarCRMTestCases(TestCase):
     def test_get_module_fields(self):
         response = self.client.get_module_fields(self.module)
         self.assertIn('module_fields', response)
+
+    def test_iter_entry_list(self):
+        response = self.client.get_entry_list(self.module, max_results=5)
+        entries = list(self.client.iter_entry_list(self.module, page_size=2, prefetch=True))
+        self.assertEqual(len(entries), int(response['total_count']))
+
+    def test_iter_entry_list_parallel(self):
+        response = self.client.get_entries_count(self.module)
+        entries = list(self.client.iter_entry_list_parallel(self.module, page_size=2, order_by='id'))
+        self.assertEqual(len(entries), int(response['result_count']))
+
+    def test_session_store(self):
+        store = MemorySessionStore()
+        client = Client(self.server_url, self.username, self.password, lazy_login=True, session_store=store)
+        self.assertIsNone(store.get(client.session_key))
+        session_id = client.session_id
+        other = Client(self.server_url, self.username, self.password, session_store=store)
+        self.assertEqual(other.session_id, session_id)
+
+    def test_get_entries_bulk(self):
+        response = self.client.get_entry_list(self.module, max_results=5)
+        ids = [entry['id'] for entry in response['entry_list']]
+        result = self.client.get_entries_bulk(self.module, ids + ids + ['missing-id'], chunk_size=2)
+        self.assertEqual(sorted(result.entries), sorted(ids))
+        self.assertEqual(result.missing, ['missing-id'])
+
+    def test_get_module_fields_md5(self):
+        response = self.client.get_module_fields_md5(self.module)
+        self.assertIn(self.module, response)
+
+    def test_get_entry_list_decode(self):
+        response = self.client.get_entry_list(self.module, max_results=2, select_fields=['id', 'name'], decode='records')
+        for record in response['entry_list']:
+            self.assertIsInstance(record.id, str)
+        response = self.client.get_entry_list(self.module, max_results=2, select_fields=['id', 'name'], decode='columns')
+        self.assertIn('name', response['entry_list'])
+
+    def test_get_entry_list_stream(self):
+        response = self.client.get_entry_list(self.module, max_results=5)
+        stream = self.client.get_entry_list(self.module, max_results=5, stream=True)
+        self.assertEqual(list(stream), response['entry_list'])
+        self.assertEqual(stream.meta['next_offset'], response['next_offset'])
@@ -0,0 +1,471 @@
+import asyncio
+import io
+import json
+import os
+import pathlib
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from decimal import Decimal
+from unittest import TestCase, skipIf
+
+import requests
+from sugarcrm import exception
+from sugarcrm.async_client import AsyncClient, aiohttp
+from sugarcrm.cache import TTLCache
+from sugarcrm.client import Client
+from sugarcrm.codec import OrjsonCodec, StdlibCodec, orjson
+from sugarcrm.export import export_module
+from sugarcrm.limiter import AIMDLimiter
+from sugarcrm.query import compare, keyset_clause
+from sugarcrm.metrics import MetricsRegistry
+from sugarcrm.pool import ClientPool
+from sugarcrm.session import SQLiteSessionStore
+from sugarcrm.standin import StandInServer
+from sugarcrm.streaming import JSONStream
+from sugarcrm.sync import SyncEngine
+
+
+class Label(str):
+    pass
+
+
+class StandInTestCases(TestCase):
+    """Runs the client against the local stand-in server, without a live CRM."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = StandInServer(records=300).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.stop()
+
+    def setUp(self):
+        self.client = Client(self.server.url, 'admin', 'admin')
+
+    def test_invalid_login(self):
+        with self.assertRaises(exception.InvalidLogin):
+            Client(self.server.url, 'admin', 'wrong')
+
+    def test_relogin_on_expired_session(self):
+        session_id = self.client.session_id
+        self.server.expire_sessions()
+        response = self.client.get_entries_count('Accounts')
+        self.assertEqual(response['result_count'], 300)
+        self.assertNotEqual(self.client.session_id, session_id)
+
+    def test_session_store(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'sessions.db')
+            store = SQLiteSessionStore(path)
+            self.assertEqual(os.stat(path).st_mode & 0o777, 0o600)
+            client = Client(self.server.url, 'admin', 'admin', session_store=store)
+            logins = self.server.calls['login']
+            other = Client(self.server.url, 'admin', 'admin', lazy_login=True, session_store=store)
+            other.get_entries_count('Accounts')
+            self.assertEqual(other.session_id, client.session_id)
+            self.assertEqual(self.server.calls['login'], logins)
+            # A session is not reused with other credentials.
+            with self.assertRaises(exception.InvalidLogin):
+                Client(self.server.url, 'admin', 'wrong', lazy_login=True,
+                       session_store=store).get_entries_count('Accounts')
+
+    def test_lazy_login_once(self):
+        client = Client(self.server.url, 'admin', 'admin', lazy_login=True)
+        logins = self.server.calls['login']
+        with ThreadPoolExecutor(8) as executor:
+            list(executor.map(lambda _: client.get_entries_count('Accounts'), range(8)))
+        self.assertEqual(self.server.calls['login'], logins + 1)
+
+    def test_internal_error(self):
+        # Malformed arguments get an error response instead of a dropped connection.
+        response = requests.post(self.server.url, data={'method': 'get_entry_list', 'input_type': 'JSON',
+                                                        'response_type': 'JSON', 'rest_data': '{'})
+        self.assertEqual(response.json()['number'], 1001)
+        response = self.server.call('get_entry_list', [self.client.session_id])
+        self.assertEqual(response['name'], 'Internal Error')
+
+    def test_iter_entry_list(self):
+        for kwargs in ({}, {'prefetch': True}, {'stream': True}):
+            ids = [entry['id'] for entry in self.client.iter_entry_list('Contacts', page_size=70, **kwargs)]
+            self.assertEqual(len(set(ids)), 300)
+
+    def test_iter_entry_list_parallel(self):
+        ids = [entry['id'] for entry in self.client.iter_entry_list_parallel(
+            'Contacts', page_size=40, order_by='contacts.id', ordered=False)]
+        self.assertEqual(sorted(ids), sorted(set(ids)))
+        self.assertEqual(len(ids), 300)
+
+    def test_get_entry_list_stream(self):
+        response = self.client.get_entry_list('Accounts', max_results=50)
+        stream = self.client.get_entry_list('Accounts', max_results=50, stream=True)
+        self.assertEqual(list(stream), response['entry_list'])
+        self.assertEqual(stream.meta['next_offset'], 50)
+
+    def test_get_entry_list_decode(self):
+        response = self.client.get_entry_list('Accounts', max_results=5, select_fields=['name'], decode='records')
+        self.assertEqual(response['entry_list'][0]._fields, ('id', 'name'))
+        response = self.client.get_entry_list('Accounts', max_results=5, select_fields=['name'], decode='columns')
+        self.assertEqual(len(response['entry_list']['name']), 5)
+
+    def test_get_entries_bulk(self):
+        response = self.client.get_entry_list('Accounts', max_results=30)
+        ids = [entry['id'] for entry in response['entry_list']]
+        result = self.client.get_entries_bulk('Accounts', ids + ids[:5] + ['missing'], chunk_size=7)
+        self.assertEqual(sorted(result.entries), sorted(ids))
+        self.assertEqual(result.missing, ['missing'])
+        with self.assertRaises(exception.WrongParameter):
+            self.client.get_entries_bulk('Accounts', ids, decode='records')
+
+    def test_iter_set_entries(self):
+        records = [{'first_name': 'Bulk', 'last_name': str(i)} for i in range(25)]
+        results = list(self.client.iter_set_entries('Leads', records, batch_size=10))
+        self.assertEqual([result.record for result in results], records)
+        self.assertTrue(all(result.id and result.error is None for result in results))
+
+    def test_set_entries_dict(self):
+        response = self.client.set_entries('Leads', {'first_name': 'Single', 'last_name': 'Record'})
+        self.assertEqual(len(response['ids']), 1)
+        entry = self.client.get_entry('Leads', response['ids'][0], select_fields=['last_name'])
+        self.assertEqual(entry['entry_list'][0]['name_value_list']['last_name']['value'], 'Record')
+
+    def test_metadata_cache(self):
+        client = Client(self.server.url, 'admin', 'admin', metadata_cache=TTLCache(ttl=0))
+        fields = client.get_module_fields('Accounts')
+        calls = dict(self.server.calls)
+        self.assertEqual(client.get_module_fields('Accounts'), fields)
+        self.assertEqual(self.server.calls['get_module_fields'], calls['get_module_fields'])
+        self.assertEqual(self.server.calls['get_module_fields_md5'], calls['get_module_fields_md5'] + 1)
+        client.get_module_fields('Accounts')['module_fields'].clear()
+        self.assertEqual(client.get_module_fields('Accounts'), fields)
+
+    def test_sync(self):
+        engine = SyncEngine(self.client, ':memory:', page_size=100)
+        result = engine.sync('Notes')
+        self.assertEqual(result.upserted, engine.count('Notes'))
+        self.assertEqual(engine.count('Notes'), int(self.client.get_entries_count('Notes')['result_count']))
+        ids = [entry['id'] for entry in self.client.get_entry_list('Notes', max_results=2)['entry_list']]
+        self.client.set_entry('Notes', {'id': ids[0], 'deleted': 1})
+        self.client.set_entry('Notes', {'id': ids[1], 'name': 'Changed'})
+        result = engine.sync('Notes')
+        self.assertEqual(result.deleted, 1)
+        self.assertGreaterEqual(result.upserted, 1)
+        self.assertIsNone(engine.get('Notes', ids[0]))
+        self.assertEqual(engine.get('Notes', ids[1])['name'], 'Changed')
+        self.assertEqual(int(self.client.get_entries_count('Notes', deleted=True)['result_count']), 1)
+
+    def test_sync_relationships(self):
+        engine = SyncEngine(self.client, ':memory:', page_size=50)
+        result = engine.sync_relationships('Accounts', 'Contacts', select_fields=['last_name'])
+        linked = self.client.get_entries_count('Contacts', query="contacts.account_id <> ''")['result_count']
+        self.assertEqual(result.upserted, int(linked))
+        self.assertGreater(result.upserted, 50)
+        contact = self.client.get_entry_list('Contacts', query="contacts.account_id <> ''", max_results=1,
+                                             select_fields=['id'])['entry_list'][0]['id']
+        self.assertIn('last_name', engine.get_relationship('Accounts', 'Contacts', contact))
+        self.client.set_entry('Contacts', {'id': contact, 'deleted': 1})
+        result = engine.sync_relationships('Accounts', 'Contacts')
+        self.assertEqual(result.deleted, 1)
+        self.assertIsNone(engine.get_relationship('Accounts', 'Contacts', contact))
+
+    def test_metrics(self):
+        metrics = MetricsRegistry()
+        client = Client(self.server.url, 'admin', 'admin', metrics=metrics)
+        client.get_entry_list('Accounts', max_results=10)
+        with self.assertRaises(exception.UnknownError):
+            client.get_entry_list('Missing')
+        stats = metrics.snapshot()['get_entry_list']
+        self.assertEqual(stats['calls'], 2)
+        self.assertEqual(stats['errors'], {'20': 1})
+        self.assertEqual(sum(stats['latency_histogram'].values()), 2)
+        self.assertGreater(stats['response_bytes'], stats['request_bytes'])
+
+    def test_entry_cache(self):
+        client = Client(self.server.url, 'admin', 'admin', entry_cache=TTLCache(maxsize=100, ttl=60))
+        ids = [entry['id'] for entry in client.get_entry_list('Contacts', max_results=3)['entry_list']]
+        client.get_entries('Contacts', ids[:2])
+        calls = dict(self.server.calls)
+        response = client.get_entries('Contacts', ids)
+        self.assertEqual([entry['id'] for entry in response['entry_list']], ids)
+        self.assertEqual(self.server.calls['get_entries'], calls['get_entries'] + 1)
+        client.get_entry('Contacts', ids[0])
+        self.assertEqual(self.server.calls.get('get_entry'), calls.get('get_entry'))
+        client.set_entry('Contacts', {'id': ids[0], 'title': 'Cached'})
+        response = client.get_entry('Contacts', ids[0])
+        self.assertEqual(response['entry_list'][0]['name_value_list']['title']['value'], 'Cached')
+        response['entry_list'][0]['name_value_list']['title']['value'] = 'Modified'
+        response = client.get_entry('Contacts', ids[0])
+        self.assertEqual(response['entry_list'][0]['name_value_list']['title']['value'], 'Cached')
+        # A value read before an invalidation of its tag is not cached.
+        generation = client.entry_cache.generation
+        client.entry_cache.invalidate('tag')
+        client.entry_cache.set('key', 'stale', tags=['tag'], generation=generation)
+        self.assertIsNone(client.entry_cache.get('key'))
+        with tempfile.TemporaryDirectory() as directory:
+            with self.assertRaises(exception.WrongParameter):
+                Client(self.server.url, 'admin', 'admin', entry_cache=TTLCache(path=os.path.join(directory, 'c')))
+
+    def test_entry_cache_coalescing(self):
+        client = Client(self.server.url, 'admin', 'admin', entry_cache=TTLCache(maxsize=100, ttl=60))
+        id = client.get_entry_list('Contacts', max_results=1)['entry_list'][0]['id']
+        calls = self.server.calls.get('get_entry', 0)
+        barrier = threading.Barrier(8)
+
+        def get_entry(_):
+            barrier.wait()
+            return client.get_entry('Contacts', id)['entry_list'][0]['id']
+
+        latency, self.server.latency = self.server.latency, 0.2
+        try:
+            with ThreadPoolExecutor(8) as executor:
+                self.assertEqual(list(executor.map(get_entry, range(8))), [id] * 8)
+        finally:
+            self.server.latency = latency
+        self.assertEqual(self.server.calls['get_entry'], calls + 1)
+
+    def test_get_relationships_bulk(self):
+        ids = [entry['id'] for entry in self.client.get_entry_list('Accounts', max_results=20)['entry_list']]
+        related = self.client.get_relationships_bulk('Accounts', ids, 'contacts', related_fields=['id', 'last_name'],
+                                                     page_size=1)
+        linked = self.client.get_relationships_bulk('Accounts', ids, 'contacts', related_fields=['id', 'last_name'],
+                                                    use_entry_list=True)
+        self.assertEqual(list(related), ids)
+        for id in ids:
+            self.assertEqual([e['id'] for e in related[id]], sorted(e['id'] for e in linked[id]))
+
+    def test_limiter(self):
+        limiter = AIMDLimiter(initial=2, max_limit=3)
+        client = Client(self.server.url, 'admin', 'admin', limiter=limiter)
+        entries = list(client.iter_entry_list_parallel('Accounts', page_size=20, max_workers=4))
+        self.assertEqual(len(entries), client.get_entries_count('Accounts')['result_count'])
+        self.assertEqual(limiter.in_flight, 0)
+        self.assertLessEqual(limiter.limit, 3)
+        limit = limiter.limit
+        limiter.release(limiter.acquire(), error=True)
+        self.assertEqual(limiter.limit, max(1, limit / 2))
+
+    def test_note_attachment(self):
+        id = self.client.get_entry_list('Notes', max_results=1)['entry_list'][0]['id']
+        content = os.urandom(200000)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = pathlib.Path(tmp, 'upload.bin')
+            path.write_bytes(content)
+            self.client.set_note_attachment(id, 'upload.bin', path)
+            response = self.client.get_note_attachment(id, dest=str(path.with_name('download.bin')))
+            self.assertEqual(response['note_attachment']['filename'], 'upload.bin')
+            self.assertEqual(path.with_name('download.bin').read_bytes(), content)
+        self.client.set_note_attachment(id, 'upload.bin', io.BytesIO(content[:1000]))
+        out = io.BytesIO()
+        self.client.get_note_attachment(id, dest=out)
+        self.assertEqual(out.getvalue(), content[:1000])
+        # After the session expired, a seekable file is sent again and one that is not seekable is refused.
+        self.server.expire_sessions()
+        self.client.set_note_attachment(id, 'upload.bin', io.BytesIO(content[:2000]))
+        read, write = os.pipe()
+        os.write(write, content[:500])
+        os.close(write)
+        self.server.expire_sessions()
+        with os.fdopen(read, 'rb') as pipe:
+            with self.assertRaises(exception.InvalidSession):
+                self.client.set_note_attachment(id, 'upload.bin', pipe)
+        out = io.BytesIO()
+        self.client.get_note_attachment(id, dest=out)
+        self.assertEqual(out.getvalue(), content[:2000])
+        # Values that are not JSON serializable raise before anything is sent.
+        calls = self.server.total_calls
+        with self.assertRaises(TypeError):
+            self.client.set_note_attachment(id, 'upload.bin', io.BytesIO(content), related_module_id=object())
+        with self.assertRaises(TypeError):
+            self.client.set_entry('Notes', {'id': id, 'description': object()})
+        self.assertEqual(self.server.total_calls, calls)
+
+    def test_export_module(self):
+        count = int(self.client.get_entries_count('Contacts')['result_count'])
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'contacts.csv')
+            result = export_module(self.client, 'Contacts', path, format='csv', select_fields=['last_name'],
+                                   order_by='contacts.id', page_size=50, processes=2)
+            self.assertEqual(result.records, count)
+            with open(path) as f:
+                self.assertEqual(f.readline().strip(), 'id,last_name')
+                self.assertEqual(len(f.readlines()), count)
+
+    def test_export_module_resume(self):
+        server = self.server
+
+        class InterruptedClient(Client):
+            def get_entry_list(self, *args, **kwargs):
+                if server.calls['get_entry_list'] >= calls + 3:
+                    raise ConnectionError('interrupted')
+                return super().get_entry_list(*args, **kwargs)
+
+        count = int(self.client.get_entries_count('Accounts')['result_count'])
+        calls = self.server.calls['get_entry_list']
+        with tempfile.TemporaryDirectory() as tmp:
+            path, checkpoint = os.path.join(tmp, 'accounts.jsonl'), os.path.join(tmp, 'checkpoint')
+            kwargs = dict(order_by='accounts.id', page_size=40, checkpoint=checkpoint)
+            with self.assertRaises(ConnectionError):
+                export_module(InterruptedClient(self.server.url, 'admin', 'admin'), 'Accounts', path, **kwargs)
+            result = export_module(self.client, 'Accounts', path, **kwargs)
+            self.assertTrue(result.resumed)
+            with open(path) as f:
+                ids = [json.loads(line)['id'] for line in f]
+            self.assertEqual(len(ids), count)
+            self.assertEqual(len(set(ids)), count)
+            self.assertFalse(os.path.exists(checkpoint))
+
+    def test_iter_entry_list_keyset(self):
+        by_offset = [entry['id'] for entry in self.client.iter_entry_list(
+            'Contacts', page_size=7, order_by='contacts.date_modified, contacts.id')]
+        by_keyset = [entry['id'] for entry in self.client.iter_entry_list(
+            'Contacts', page_size=7, pagination='keyset', select_fields=['last_name'], prefetch=True)]
+        streamed = [entry['id'] for entry in self.client.iter_entry_list(
+            'Contacts', page_size=7, pagination='keyset', stream=True)]
+        self.assertEqual(by_keyset, by_offset)
+        self.assertEqual(streamed, by_offset)
+        self.assertEqual(keyset_clause(['date_modified', 'id'], ['2020', "a'b"], 'contacts'),
+                         "(contacts.date_modified >= '2020') AND ((contacts.date_modified > '2020') OR "
+                         "((contacts.date_modified = '2020') AND (contacts.id > 'a''b')))")
+        response = self.client.get_entry_list('Contacts', query=compare('contacts.last_name', '=', "x' OR '1'='1"))
+        self.assertEqual(response['entry_list'], [])
+        self.assertEqual(compare('amount', '>', Decimal('1.50')), 'amount > 1.50')
+        for value in (float('nan'), float('inf'), Decimal('NaN'), 1j, object()):
+            with self.assertRaises(exception.WrongParameter):
+                compare('amount', '>', value)
+
+    def test_json_codec(self):
+        client = Client(self.server.url, 'admin', 'admin', json_codec=StdlibCodec())
+        query = "contacts.last_name <> 'Ñandú'"
+        self.assertEqual(client.get_entry_list('Contacts', query=query, max_results=5),
+                         self.client.get_entry_list('Contacts', query=query, max_results=5))
+        for json_codec in (StdlibCodec(),) + ((OrjsonCodec(),) if orjson is not None else ()):
+            self.assertEqual(json.loads(json_codec.dumps([Label('x'), {1: 2}])), ['x', {'1': 2}])
+            with self.assertRaises(TypeError):
+                json_codec.dumps([date(2020, 1, 1)])
+
+    def test_verify(self):
+        client = Client(self.server.url, 'admin', 'admin', verify=False)
+        self.assertIs(client._verify, False)
+        client.verify = True
+        self.assertIs(client.verify, True)
+        self.assertIsNot(client._verify, False)
+
+    def test_client_pool(self):
+        logins = self.server.calls['login']
+        with ClientPool(max_in_flight=4, max_in_flight_per_host=2, idle_timeout=60) as pool:
+            client = pool.get(self.server.url, 'admin', 'admin')
+            self.assertIs(pool.get(self.server.url, 'admin', 'admin'), client)
+            entries = list(client.iter_entry_list_parallel('Accounts', page_size=30, max_workers=4))
+            self.assertEqual(len(entries), int(client.get_entries_count('Accounts')['result_count']))
+            # Calls count as use, so a client used since it was returned by get is kept.
+            pool.idle_timeout = 0.5
+            time.sleep(0.4)
+            client.get_entries_count('Accounts')
+            time.sleep(0.2)
+            pool.evict_idle()
+            self.assertEqual(len(pool), 1)
+            pool.idle_timeout = 0
+            pool.evict_idle()
+            self.assertEqual(len(pool), 0)
+            pool.idle_timeout = 60
+            other = pool.get(self.server.url, 'admin', 'admin')
+            self.assertIsNot(other, client)
+            # The evicted client still in use shares the limiter of its host with the new one.
+            self.assertIs(other.limiter.limiters[0], client.limiter.limiters[0])
+            self.assertEqual(other.session_id, client.session_id)
+            other.get_entries_count('Accounts')
+            self.assertEqual(self.server.calls['login'], logins + 1)
+            # A client with another password does not reuse the session.
+            with self.assertRaises(exception.InvalidLogin):
+                pool.get(self.server.url, 'admin', 'wrong').get_entries_count('Accounts')
+
+    def test_iter_search_by_module(self):
+        modules = ['Accounts', 'Contacts', 'Leads']
+        response = self.client.search_by_module('a', modules, max_results=15)
+        expected = {item['name']: [r['id']['value'] for r in item['records']] for item in response['entry_list']}
+        found = {module: [] for module in modules}
+        for hit in self.client.iter_search_by_module('a', modules, max_results=15, page_size=4):
+            self.assertEqual(hit.rank, len(found[hit.module_name]))
+            found[hit.module_name].append(hit.record['id']['value'])
+        self.assertEqual(found, expected)
+        self.assertEqual(list(self.client.iter_search_by_module('a', modules, deadline=0)), [])
+
+    @skipIf(aiohttp is None, 'aiohttp is not installed')
+    def test_async_client(self):
+        async def run():
+            async with AsyncClient(self.server.url, 'admin', 'admin') as client:
+                response = await client.get_entry_list('Accounts', max_results=5)
+                self.assertEqual(len(response['entry_list']), 5)
+                session_id = client.session_id
+                self.server.expire_sessions()
+                ids = [entry['id'] async for entry in client.iter_entry_list('Accounts', page_size=40)]
+                self.assertNotEqual(client.session_id, session_id)
+                self.assertEqual(len(ids), int((await client.get_entries_count('Accounts'))['result_count']))
+                with self.assertRaises(NotImplementedError):
+                    client.get_entries_bulk('Accounts', ids)
+                with self.assertRaises(NotImplementedError):
+                    client.get_entry_list('Accounts', stream=True)
+
+        asyncio.run(run())
+        context = AsyncClient(self.server.url, 'admin', 'admin', verify=requests.certs.where())._ssl()
+        self.assertGreater(context.cert_store_stats()['x509_ca'], 0)
+        self.assertIs(AsyncClient(self.server.url, 'admin', 'admin', verify=False)._ssl(), False)
+
+    def test_retries(self):
+        client = Client(self.server.url, 'admin', 'admin', backoff_factor=0)
+        self.server.inject_faults(2, 'error', methods=['get_entries_count'])
+        self.assertIn('result_count', client.get_entries_count('Accounts'))
+        self.server.inject_faults(2, 'drop', methods=['get_entry_list'])
+        self.assertEqual(len(client.get_entry_list('Accounts', max_results=3)['entry_list']), 3)
+        self.assertEqual(self.server.pending_faults, 0)
+        self.server.inject_faults(2, 'drop', methods=['set_entry'])
+        try:
+            with self.assertRaises(requests.exceptions.ConnectionError):
+                client.set_entry('Notes', {'name': 'Not retried'})
+            self.assertEqual(self.server.pending_faults, 1)
+        finally:
+            self.server.inject_faults(0)
+        # A read is sent at most 1 + max_retries times, then the server error is raised.
+        self.server.inject_faults(5, 'error', methods=['get_entries_count'])
+        try:
+            with self.assertRaises(exception.UnknownError) as context:
+                client.get_entries_count('Accounts')
+            self.assertEqual(context.exception.number, 500)
+            self.assertEqual(self.server.pending_faults, 1)
+        finally:
+            self.server.inject_faults(0)
+
+
+class JSONStreamTestCases(TestCase):
+    """Feeds JSONStream chunks of a few bytes, so values, numbers and UTF-8 characters are split across chunks."""
+
+    body = {
+        'result_count': 3,
+        'next_offset': 1234567,
+        'entry_list': [
+            {'id': 'a', 'name_value_list': {'name': {'name': 'name', 'value': 'Ñandú 😀 €'}}, 'amount': -12345.678e-3},
+            {'id': 'b', 'description': 'x' * 5000 + 'é' * 1000, 'numbers': [0, 1, 10 ** 20, 3.5]},
+            {'id': 'c', 'nested': {'list': [[], {}, None, True, False]}},
+        ],
+        'relationship_list': [{'link_list': []}],
+    }
+
+    def chunks(self, size):
+        data = json.dumps(self.body, ensure_ascii=False, indent=1).encode('utf8')
+        return [data[i:i + size] for i in range(0, len(data), size)]
+
+    def test_small_chunks(self):
+        for size in (1, 2, 3):
+            stream = JSONStream(self.chunks(size))
+            self.assertTrue(stream.open())
+            self.assertEqual(stream.meta, {'result_count': 3, 'next_offset': 1234567})
+            self.assertEqual(list(stream), self.body['entry_list'])
+            self.assertEqual(stream.meta['relationship_list'], self.body['relationship_list'])
+
+    def test_truncated_body(self):
+        chunks = self.chunks(3)
+        with self.assertRaises(ValueError):
+            list(JSONStream(chunks[:len(chunks) // 2]))